@@ -0,0 +1,44 @@
+# backtest.py
+
+#!/usr/bin/env python3
+
+import argparse
+import pandas as pd
+from pathlib import Path
+from src.config import FREQ
+from src.data.cache import load_preprocessed_data
+from src.evaluation.backtest import MODELS, backtest, score_backtest
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtesting rolling-origin de los modelos")
+    parser.add_argument("--models",  nargs="+", default=list(MODELS), choices=MODELS)
+    parser.add_argument("--initial", type=int, default=None, help="periodos del primer entrenamiento")
+    parser.add_argument("--horizon", type=int, default=None)
+    parser.add_argument("--step",    type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    # 1) Carga y preprocesado (caché compartida con train / evaluate)
+    df_ts = load_preprocessed_data(freq=FREQ)
+
+    # 2) Folds en paralelo
+    preds = backtest(df_ts, models=args.models, initial=args.initial,
+                     horizon=args.horizon, step=args.step, n_workers=args.workers)
+
+    # 3) Métricas por fold y por horizonte
+    metrics = score_backtest(preds)
+    out = Path("models")
+    out.mkdir(exist_ok=True)
+    preds.to_csv(out / "backtest_predictions.csv", index=False)
+    metrics.to_csv(out / "backtest_metrics.csv", index=False)
+    failures = pd.DataFrame(preds.attrs.get("failures", []), columns=["fold", "cutoff", "error"])
+    failures.to_csv(out / "backtest_failures.csv", index=False)
+    if not failures.empty:
+        print(f"⚠️  {len(failures)} folds fallidos, detalle en {out}/backtest_failures.csv")
+
+    summary = metrics[metrics["level"] == "fold"].groupby("model")[["MAE", "RMSE", "sMAPE (%)", "MASE"]].mean()
+    print(summary.round(3).to_string())
+    print(f"✅ Backtest guardado en {out}/backtest_predictions.csv y backtest_metrics.csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# benchmarks/bench_calendar_features.py
+#
+# is_holiday / days_to_holiday: versión original (apply por fecha, O(n·h))
+# frente a src/features/calendar.py (isin + searchsorted) sobre 20 años diarios.
+#   python benchmarks/bench_calendar_features.py --years 20
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+import holidays
+
+from src.features.calendar import holiday_dates, holiday_features
+
+
+def holiday_features_apply(index: pd.DatetimeIndex) -> pd.DataFrame:
+    """Implementación previa de enrich_features."""
+    us_holidays = holidays.US()
+    s = index.to_series()
+    is_holiday = s.apply(lambda d: 1 if d in us_holidays else 0)
+    hol_dates  = np.array(sorted(pd.to_datetime(list(us_holidays.keys()))))
+    days_to    = s.apply(
+        lambda d: (hol_dates[hol_dates >= d][0] - d).days if any(hol_dates >= d) else 0
+    )
+    return pd.DataFrame({"is_holiday": is_holiday, "days_to_holiday": days_to})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    index = pd.date_range("2005-01-01", periods=365 * args.years, freq="D")
+
+    t0  = time.perf_counter()
+    old = holiday_features_apply(index)
+    t_old = time.perf_counter() - t0
+
+    # Frío: incluye construir la tabla de festivos; caliente: tabla ya cacheada
+    holiday_dates.cache_clear()
+    t0  = time.perf_counter()
+    new = holiday_features(index)
+    t_cold = time.perf_counter() - t0
+    t0  = time.perf_counter()
+    for _ in range(args.repeat):
+        holiday_features(index)
+    t_warm = (time.perf_counter() - t0) / args.repeat
+
+    assert (old["is_holiday"].values == new["is_holiday"].values).all()
+    assert (old["days_to_holiday"].values == new["days_to_holiday"].values).all()
+
+    print(f"{len(index)} días ({args.years} años)")
+    print(f"apply:              {t_old * 1e3:10.1f} ms")
+    print(f"vectorizado (frío): {t_cold * 1e3:10.1f} ms  ({t_old / t_cold:6.0f}x)")
+    print(f"vectorizado (cache):{t_warm * 1e3:10.1f} ms  ({t_old / t_warm:6.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
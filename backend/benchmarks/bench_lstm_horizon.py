@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# benchmarks/bench_lstm_horizon.py
+#
+# Forecast de H pasos con el LSTM: un forward de la cabeza directa
+# (Linear(hidden, H)) frente al rollout iterativo del modelo de un paso
+# (H forwards, reinyectando cada predicción en la ventana). Pesos aleatorios:
+# solo se mide latencia, no precisión.
+#   python benchmarks/bench_lstm_horizon.py --horizon 90 --threads 4
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np
+import torch
+
+from src.features.lstm_features import LSTM_FEATURES
+from src.models.LSTM_model import LSTMModel
+
+
+def direct(model, x: torch.Tensor) -> torch.Tensor:
+    return model(x)
+
+
+def rollout(model, x: torch.Tensor, horizon: int, target_idx: int) -> torch.Tensor:
+    # Las exógenas se repiten de la última fila; solo importa el coste
+    window, preds = x.clone(), []
+    for _ in range(horizon):
+        y = model(window)[:, 0]
+        preds.append(y)
+        nxt = window[:, -1:].clone()
+        nxt[:, 0, target_idx] = y
+        window = torch.cat([window[:, 1:], nxt], dim=1)
+    return torch.stack(preds, dim=1)
+
+
+def bench(fn, repeat: int) -> float:
+    with torch.no_grad():
+        fn()  # calentamiento
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    return np.median(times) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--horizon", type=int, default=90)
+    parser.add_argument("--seq-len", type=int, default=60)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 64])
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+    n_feat     = len(LSTM_FEATURES)
+    target_idx = LSTM_FEATURES.index("sales_log")
+    one_step   = LSTMModel(n_feat, dropout=0.0).eval()
+    multi      = LSTMModel(n_feat, dropout=0.0, horizon=args.horizon).eval()
+
+    print(f"H={args.horizon}, seq_len={args.seq_len}, hilos={torch.get_num_threads()}")
+    print(f"{'batch':>7}{'directo ms':>13}{'iterativo ms':>15}{'speedup':>10}")
+    for batch in args.batch:
+        x    = torch.randn(batch, args.seq_len, n_feat)
+        t_d  = bench(lambda: direct(multi, x), args.repeat)
+        t_it = bench(lambda: rollout(one_step, x, args.horizon, target_idx), max(3, args.repeat // 3))
+        print(f"{batch:>7}{t_d:>13.2f}{t_it:>15.2f}{t_it / t_d:>9.1f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# benchmarks/bench_lstm_runtime.py
+#
+# Latencia y throughput del LSTM: eager (torch.no_grad) frente a TorchScript,
+# TorchScript con cuantización dinámica int8 y ONNX Runtime (si está instalado),
+# con batch 1, 32 y 1024. Los artefactos se exportan a un directorio temporal.
+#   python benchmarks/bench_lstm_runtime.py --threads 4
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np
+import torch
+
+from src.models.lstm_export import (
+    STATE_PATH, export_lstm, load_eager, load_torchscript, ort, OnnxLSTM, set_lstm_threads,
+)
+
+
+def bench(model, x: torch.Tensor, repeat: int):
+    with torch.no_grad():
+        model(x)  # calentamiento
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            model(x)
+            times.append(time.perf_counter() - t0)
+    times = np.array(times)
+    return np.median(times) * 1e3, x.shape[0] / times.mean()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--state", default=str(BASE_DIR / STATE_PATH))
+    parser.add_argument("--seq-len", type=int, default=60)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    set_lstm_threads(args.threads)
+    eager = load_eager(Path(args.state))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        meta = export_lstm(args.state, tmp, seq_len=args.seq_len, onnx=ort is not None)
+        runtimes = {"eager": eager, "torchscript": load_torchscript(Path(tmp) / meta["files"]["torchscript"])}
+        if ort is not None:
+            runtimes["onnx"] = OnnxLSTM(Path(tmp) / meta["files"]["onnx"], n_threads=args.threads)
+        q_dir = Path(tmp) / "int8"
+        export_lstm(args.state, q_dir, seq_len=args.seq_len, quantize=True)
+        runtimes["torchscript-int8"] = load_torchscript(q_dir / meta["files"]["torchscript"])
+
+        print(f"LSTM {meta['input_size']}→{meta['hidden_size']}×{meta['num_layers']}, "
+              f"seq_len={args.seq_len}, hilos={torch.get_num_threads()}")
+        print(f"{'runtime':<18}{'batch':>7}{'p50 ms':>10}{'filas/s':>12}{'max |Δ|':>10}")
+        for batch in args.batch:
+            x = torch.randn(batch, args.seq_len, meta["input_size"])
+            with torch.no_grad():
+                ref = eager(x).numpy()
+            for name, model in runtimes.items():
+                with torch.no_grad():
+                    diff = np.abs(model(x).numpy() - ref).max()
+                p50, rps = bench(model, x, max(3, args.repeat // (1 + batch // 256)))
+                print(f"{name:<18}{batch:>7}{p50:>10.2f}{rps:>12.0f}{diff:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
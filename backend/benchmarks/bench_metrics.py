@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# benchmarks/bench_metrics.py
+#
+# Métricas de un backtest en formato largo (series × horizonte): un
+# groupby + evaluación por serie con NumPy/sklearn frente a score_frame
+# (una pasada con bincount).
+#   python benchmarks/bench_metrics.py --series 10000 --horizon 90
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import r2_score
+
+from src.evaluation.metrics import score_frame
+
+
+def score_per_series(df: pd.DataFrame) -> pd.DataFrame:
+    """Una serie cada vez, como hacía evaluate_forecast."""
+    rows = {}
+    for key, g in df.groupby("series"):
+        y_true, y_pred = g["y_true"].values, g["y_pred"].values
+        nz    = y_true != 0
+        denom = (np.abs(y_true) + np.abs(y_pred)) / 2
+        rows[key] = {
+            "MAE":       np.mean(np.abs(y_true - y_pred)),
+            "RMSE":      np.sqrt(np.mean((y_true - y_pred) ** 2)),
+            "MAPE (%)":  np.mean(np.abs((y_true[nz] - y_pred[nz]) / y_true[nz])) * 100,
+            "sMAPE (%)": np.mean(np.abs(y_true - y_pred) / denom) * 100,
+            "MASE":      np.mean(np.abs(y_true - y_pred)) / np.mean(np.abs(np.diff(y_true))),
+            "R2":        r2_score(y_true, y_pred),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=10000)
+    parser.add_argument("--horizon", type=int, default=90)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n   = args.series * args.horizon
+    df  = pd.DataFrame({
+        "series":  np.repeat(np.arange(args.series), args.horizon),
+        "horizon": np.tile(np.arange(1, args.horizon + 1), args.series),
+        "y_true":  rng.gamma(2.0, 50.0, n),
+    })
+    df["y_pred"] = df["y_true"] + rng.normal(0, 20, n)
+
+    t0  = time.perf_counter()
+    old = score_per_series(df)
+    t_old = time.perf_counter() - t0
+
+    t0  = time.perf_counter()
+    new = score_frame(df, "series", order="horizon").set_index("series")
+    t_new = time.perf_counter() - t0
+
+    assert np.allclose(old.values, new[old.columns].values)
+
+    print(f"{args.series} series × {args.horizon} pasos")
+    print(f"por serie:   {t_old:8.2f} s")
+    print(f"score_frame: {t_new:8.2f} s  ({t_old / t_new:6.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# benchmarks/bench_predict_csv.py
+#
+# Compara filas/segundo del scoring fila a fila original de /predict-csv
+# contra el motor vectorizado (src/serving/batch.py). Por defecto ajusta
+# en un directorio temporal artefactos compatibles (scaler de las
+# LSTM_FEATURES, LSTM sin entrenar, Prophet y XGB de residuos sobre una
+# serie sintética); con --models usa los de ese directorio.
+#   python benchmarks/bench_predict_csv.py --rows 100 1000
+#   python benchmarks/bench_predict_csv.py --models models
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy  as np
+import pandas as pd
+import torch
+from sklearn.preprocessing import MinMaxScaler
+
+from src.config                 import LSTM_HORIZON, LSTM_QUANTILES
+from src.features.lstm_features import LSTM_FEATURES, enrich_features
+from src.models.ensemble        import _fit_residual_model, _frame
+from src.models.LSTM_model      import LSTMModel, quantile_bands
+from src.models.prophet_model   import _add_date_regressors, train_prophet
+from src.serving.batch          import lstm_matrix, predict_batch, residual_matrix
+from src.serving.registry       import ModelRegistry
+
+
+def synthetic_series(n_days: int = 730, seed: int = 0) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    index = pd.date_range("2016-01-01", periods=n_days, freq="D", name="date")
+    t     = np.arange(n_days)
+    sales = 2000 + 2 * t + 400 * np.sin(2 * np.pi * t / 7) + rng.gamma(2.0, 300.0, n_days)
+    return pd.DataFrame({"sales": sales}, index=index)
+
+
+def fit_artifacts(tmp: Path):
+    """(scaler, lstm, prophet, xgb) compatibles entre sí, ajustados en tmp."""
+    df_ts   = synthetic_series()
+    scaler  = MinMaxScaler().fit(enrich_features(df_ts.copy())[LSTM_FEATURES].to_numpy(dtype=float))
+    lstm    = LSTMModel(len(LSTM_FEATURES), horizon=LSTM_HORIZON, quantiles=LSTM_QUANTILES or None).eval()
+    prophet = train_prophet(df_ts, model_path=tmp / "prophet_model.joblib")
+    yhat, cols, feats = residual_matrix(prophet, df_ts.index)
+    xgb     = _fit_residual_model(_frame(feats[:, 1:], cols[1:]), df_ts["sales"].to_numpy() - yhat)
+    return scaler, lstm, prophet, xgb
+
+
+def load_artifacts(model_dir: Path):
+    bundle = ModelRegistry(model_dir).get()
+    print("Carga de artefactos (s):", {k: round(v, 3) for k, v in bundle.load_timings.items()})
+    return bundle.lstm_scaler, bundle.lstm, bundle.prophet, bundle.xgb
+
+
+def predict_iterrows(df, scaler, lstm, prophet, xgb):
+    """
+    Ruta original: tres invocaciones de modelo por fila (Prophet con su
+    predict() completo). Las matrices de features se construyen una vez,
+    así que el bucle solo mide el coste de puntuar fila a fila.
+    """
+    arr = lstm_matrix(df, scaler)
+    _, cols, feats = residual_matrix(prophet, pd.DatetimeIndex(pd.to_datetime(df["fecha"])))
+    results = []
+    for i, (_, row) in enumerate(df.iterrows()):
+        tensor = torch.tensor(arr[i:i + 1], dtype=torch.float32).unsqueeze(0)
+        with torch.no_grad():
+            point, _, _ = quantile_bands(lstm(tensor))
+        p_lstm = float(point.reshape(-1)[0])   # primer paso del horizonte
+        tmp    = _add_date_regressors(pd.DataFrame({"ds": [pd.to_datetime(row["fecha"])]}))
+        p_prop = prophet.predict(tmp)["yhat"].iloc[0]
+        p_xgb  = xgb.predict(_frame(feats[i:i + 1, 1:], cols[1:]))[0]
+        results.append({"fecha": row["fecha"], "lstm": p_lstm,
+                        "ensemble": p_lstm + p_prop + p_xgb})
+    return results
+
+
+def synthetic_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    dates = pd.date_range("2017-01-01", periods=n_rows, freq="D")
+    return pd.DataFrame({
+        "fecha":          dates.strftime("%Y-%m-%d"),
+        "ventas_previas": rng.gamma(2.0, 1000.0, n_rows),
+        "otras_vars":     rng.normal(0.0, 1.0, n_rows),
+    })
+
+
+def timed(fn, *args):
+    t0  = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--skip-loop-above", type=int, default=1000,
+                        help="no ejecuta la ruta fila a fila por encima de este tamaño")
+    parser.add_argument("--models", default=None,
+                        help="directorio de artefactos (por defecto se ajustan unos sintéticos)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifacts = load_artifacts(Path(args.models)) if args.models else fit_artifacts(Path(tmp))
+        print(f"{'rows':>8} | {'loop rows/s':>12} | {'batch rows/s':>12} | {'speedup':>8}")
+        for n in args.rows:
+            df = synthetic_frame(n)
+            batch_out, t_batch = timed(predict_batch, df, *artifacts)
+            if n <= args.skip_loop_above:
+                loop_out, t_loop = timed(predict_iterrows, df, *artifacts)
+                diff = max(abs(a["ensemble"] - b["ensemble"]) for a, b in zip(loop_out, batch_out))
+                assert diff < 1e-3, f"Las salidas difieren (max |Δ|={diff})"
+                loop_rate = f"{n / t_loop:12.1f}"
+                speedup   = f"{t_loop / t_batch:7.1f}x"
+            else:
+                loop_rate, speedup = f"{'-':>12}", f"{'-':>8}"
+            print(f"{n:8d} | {loop_rate} | {n / t_batch:12.1f} | {speedup}")
+
+
+if __name__ == "__main__":
+    main()
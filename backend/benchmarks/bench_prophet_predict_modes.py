@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# benchmarks/bench_prophet_predict_modes.py
+#
+# Tiempo de predict del modelo guardado en cada modo de predict_with_mode
+# (components / point / reduced / full) y diferencia de yhat frente a full.
+#   python benchmarks/bench_prophet_predict_modes.py --periods 90 --repeat 5
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np
+
+from src.config import FREQ, HORIZON_DAYS
+from src.models.prophet_model import PREDICT_MODES, _add_date_regressors, load_model, predict_with_mode
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=str(BASE_DIR / "models" / "prophet_model.joblib"))
+    parser.add_argument("--periods", type=int, default=HORIZON_DAYS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    m      = load_model(Path(args.model))
+    future = _add_date_regressors(m.make_future_dataframe(periods=args.periods, freq=FREQ))
+    ref    = predict_with_mode(m, future, "full")  # también calienta cachés internas
+
+    print(f"{len(future)} filas, uncertainty_samples={m.uncertainty_samples}")
+    print(f"{'modo':<12}{'p50 ms':>10}{'columnas':>10}{'max |Δ yhat|':>14}")
+    for mode in PREDICT_MODES:
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            fc = predict_with_mode(m, future, mode)
+            times.append(time.perf_counter() - t0)
+        diff = np.abs(fc["yhat"].values - ref["yhat"].values).max()
+        print(f"{mode:<12}{np.median(times) * 1e3:>10.1f}{fc.shape[1]:>10}{diff:>14.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# benchmarks/bench_prophet_warm_start.py
+#
+# Simula el reentrenamiento diario: modelo previo ajustado sin los últimos
+# --new-days días y reajuste con la serie completa en frío vs warm-start.
+# Reporta tiempo de fit y deriva del forecast warm respecto al frío.
+#   python benchmarks/bench_prophet_warm_start.py --new-days 1 --repeat 3
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from src.config import FREQ, HORIZON_DAYS
+from src.data.cache import load_preprocessed_data
+from src.models.prophet_model import train_prophet, _add_date_regressors
+
+
+def forecast(m):
+    future = _add_date_regressors(m.make_future_dataframe(periods=HORIZON_DAYS, freq=FREQ))
+    return m.predict(future)["yhat"].values
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--new-days", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df_ts = load_preprocessed_data(freq=FREQ)
+    with tempfile.TemporaryDirectory() as tmp:
+        prev_path = Path(tmp) / "prev.joblib"
+        train_prophet(df_ts.iloc[:-args.new_days], model_path=prev_path)
+
+        t_cold, t_warm = [], []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            cold = train_prophet(df_ts, model_path=Path(tmp) / "cold.joblib")
+            t_cold.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            warm = train_prophet(df_ts, model_path=Path(tmp) / "warm.joblib",
+                                 warm_start=True, init_model_path=prev_path)
+            t_warm.append(time.perf_counter() - t0)
+
+        y_cold, y_warm = forecast(cold), forecast(warm)
+
+    drift = np.abs(y_warm - y_cold)
+    rel   = drift / np.maximum(np.abs(y_cold), 1e-9)
+    print(f"{len(df_ts)} periodos, {args.new_days} nuevos, {args.repeat} repeticiones")
+    print(f"fit frío:  {np.median(t_cold):7.2f} s (mediana)")
+    print(f"fit warm:  {np.median(t_warm):7.2f} s (mediana)  → {np.median(t_cold) / np.median(t_warm):.2f}x")
+    print(f"deriva yhat warm vs frío: max={drift.max():.4f}  media={drift.mean():.4f}  "
+          f"rel. media={100 * rel.mean():.4f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# benchmarks/bench_vif.py
+#
+# VIF de p features: statsmodels (una OLS por columna, como hacía
+# remove_redundant_features) frente a src/features/redundancy.py
+# (correlación float32 por bloques + diagonal de la inversa, y poda
+# iterativa con actualizaciones rank-one). p = 50 / 200 / 1000.
+#   python benchmarks/bench_vif.py --rows 5000 --p 50 200 1000
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from statsmodels.stats.outliers_influence import variance_inflation_factor
+
+from src.features.redundancy import correlation_matrix, prune_vif, vif_from_corr
+
+
+def synthetic(n: int, p: int, seed: int = 0) -> np.ndarray:
+    """Mitad de columnas latentes y mitad combinaciones ruidosas de ellas."""
+    rng = np.random.default_rng(seed)
+    k   = p // 2
+    Z   = rng.normal(size=(n, k))
+    mix = Z @ rng.normal(size=(k, p - k)) / np.sqrt(k) + rng.normal(scale=0.5, size=(n, p - k))
+    return np.hstack([Z, mix])
+
+
+def timed(fn, *args, **kwargs):
+    t0  = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--p", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--baseline-max", type=int, default=200,
+                        help="p máximo para correr statsmodels (es O(p) regresiones)")
+    args = parser.parse_args()
+
+    print(f"{'p':>6}{'statsmodels':>14}{'corr f32':>11}{'VIF inv':>10}{'poda iter':>11}{'eliminadas':>12}")
+    for p in args.p:
+        X = synthetic(args.rows, p)
+
+        if p <= args.baseline_max:
+            Xc = np.column_stack([np.ones(args.rows), X])  # statsmodels es sin centrar
+            _, t_sm = timed(lambda: [variance_inflation_factor(Xc, i) for i in range(1, p + 1)])
+            t_sm = f"{t_sm:12.2f}s"
+        else:
+            t_sm = f"{'—':>13}"
+
+        C, t_corr           = timed(correlation_matrix, X, dtype=np.float32)
+        _, t_vif            = timed(vif_from_corr, C)
+        (_, dropped, _), t_prune = timed(prune_vif, C, 5.0)
+        print(f"{p:>6}{t_sm:>14}{t_corr:10.3f}s{t_vif:9.3f}s{t_prune:10.3f}s{len(dropped):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,32 +2,25 @@
 import os
 import numpy as np
 import pandas as pd
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from joblib import load as joblib_load
 
 from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 import matplotlib.pyplot as plt
 
 from src.config import FREQ, HORIZON_DAYS
-from src.data.ingestion       import load_and_prepare_data
-from src.data.preprocessing   import preprocess_sales_data
-from src.models.prophet_model import load_model, predict_prophet, _add_date_regressors
-from src.models.ensemble      import _make_features, ENSEMBLE_PATH
-
-def smape(y_true, y_pred):
-    denom = np.abs(y_true) + np.abs(y_pred)
-    return 100 * np.mean(2 * np.abs(y_true - y_pred) / denom)
+from src.data.cache           import load_preprocessed_data
+from src.data.preprocessing   import inverse_log_transform
+from src.evaluation.metrics   import score_matrix
+from src.models.forecast_cache import prophet_forecast
+from src.models.ensemble      import residual_features, load_residual_model, _frame, _rows, ENSEMBLE_PATH
 
 def main():
     # 1) Carga y preprocesado
-    df_raw = load_and_prepare_data()
-    df_ts  = preprocess_sales_data(df_raw, freq=FREQ)
-
-    # 2) In-sample forecast de Prophet
-    prophet    = load_model()
-    fc_hist_df = predict_prophet(prophet, periods=0, freq=FREQ)
-    fc_hist    = (
-        fc_hist_df.set_index("ds")["yhat"]
+    df_ts  = load_preprocessed_data(freq=FREQ)
+
+    # 2) In-sample forecast de Prophet (mismo forecast memoizado que el ensemble)
+    fc_all  = prophet_forecast(periods=HORIZON_DAYS, freq=FREQ, mode="components").set_index("ds")
+    fc_hist = (
+        inverse_log_transform(fc_all["yhat"])
         .rename_axis("date")
         .reindex(df_ts.index)
         .bfill()
@@ -39,23 +32,18 @@ def main():
     y_true = df_ts["sales"].loc[idx].values
     y_p    = fc_hist.loc[idx].values
 
-    # 4) Carga el XGB entrenado
-    xgb_model = joblib_load(str(ENSEMBLE_PATH))
+    # 4) Matriz de features sobre todo el histórico (la misma caché que train_ensemble)
+    index, cols, values = residual_features(periods=HORIZON_DAYS, freq=FREQ)
 
-    # 5) Genera features sobre todo el histórico (in-sample)
-    future   = prophet.make_future_dataframe(periods=0, freq=FREQ)
-    future   = _add_date_regressors(future)
-    fc_all   = prophet.predict(future).set_index("ds")
-    feats    = _make_features(fc_all)
-    feats_hist = feats.loc[df_ts.index]
+    # 5) Carga el XGB entrenado (validando sus columnas)
+    xgb_model = load_residual_model(ENSEMBLE_PATH, cols[1:])
 
     # 6) Extrae el fragmento del último horizonte
-    feats_test = feats_hist.loc[idx]
-    X_test     = feats_test.drop(columns=["yhat"])
+    feats_test = values[_rows(index, idx)]
 
     # 7) Predice residuo y ensambla
-    resid_pred = xgb_model.predict(X_test)
-    y_e        = feats_test["yhat"].values + resid_pred
+    resid_pred = xgb_model.predict(_frame(feats_test[:, 1:], cols[1:]))
+    y_e        = feats_test[:, 0] + resid_pred
 
     # 8) Métricas (elimina cualquier NaN que quede)
     mask   = ~np.isnan(y_e)
@@ -63,21 +51,15 @@ def main():
     y_p    = y_p[mask]
     y_e    = y_e[mask]
 
-    def metrics(y_pred, label):
-        mae  = mean_absolute_error(y_true, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-        mape = np.mean(np.abs((y_true - y_pred) / y_true.clip(1e-3))) * 100
-        smp  = smape(y_true, y_pred)
-        r2   = r2_score(y_true, y_pred)
-        print(f"\n--- Métricas {label} ---")
-        print(f"MAE:   {mae:.2f}")
-        print(f"RMSE:  {rmse:.2f}")
-        print(f"MAPE:  {mape:.2f}%")
-        print(f"sMAPE: {smp:.2f}%")
-        print(f"R²:    {r2:.3f}")
-
-    metrics(y_p, "Prophet (in-sample)")
-    metrics(y_e, "Ensemble (in-sample)")
+    scores = score_matrix(y_true, np.vstack([y_p, y_e]))
+    scores.index = ["Prophet", "Ensemble"]
+    for label, row in scores.iterrows():
+        print(f"\n--- Métricas {label} (in-sample) ---")
+        print(f"MAE:   {row['MAE']:.2f}")
+        print(f"RMSE:  {row['RMSE']:.2f}")
+        print(f"MAPE:  {row['MAPE (%)']:.2f}%")
+        print(f"sMAPE: {row['sMAPE (%)']:.2f}%")
+        print(f"R²:    {row['R2']:.3f}")
 
     # 9) Diagnóstico de residuos
     residuals = y_true - y_e
@@ -98,23 +80,11 @@ def main():
 
     # 10) Guardar métricas
     os.makedirs("models", exist_ok=True)
-    pd.DataFrame({
-        "metric": ["MAE","RMSE","MAPE","sMAPE","R2"],
-        "Prophet": [
-            mean_absolute_error(y_true, y_p),
-            np.sqrt(mean_squared_error(y_true, y_p)),
-            np.mean(np.abs((y_true - y_p) / y_true.clip(1e-3))) * 100,
-            smape(y_true, y_p),
-            r2_score(y_true, y_p),
-        ],
-        "Ensemble": [
-            mean_absolute_error(y_true, y_e),
-            np.sqrt(mean_squared_error(y_true, y_e)),
-            np.mean(np.abs((y_true - y_e) / y_true.clip(1e-3))) * 100,
-            smape(y_true, y_e),
-            r2_score(y_true, y_e),
-        ]
-    }).to_csv("models/metrics_comparativo.csv", index=False)
+    (
+        scores[["MAE", "RMSE", "MAPE (%)", "sMAPE (%)", "R2"]]
+        .set_axis(["MAE", "RMSE", "MAPE", "sMAPE", "R2"], axis=1)
+        .T.rename_axis("metric").reset_index()
+    ).to_csv("models/metrics_comparativo.csv", index=False)
     print("\n✅ Métricas comparativas guardadas en models/metrics_comparativo.csv")
 
 if __name__ == "__main__":
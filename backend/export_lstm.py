@@ -0,0 +1,26 @@
+# export_lstm.py
+
+#!/usr/bin/env python3
+
+import argparse
+from src.config import LSTM_QUANTIZE
+from src.models.lstm_export import MODEL_DIR, STATE_PATH, export_lstm
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta el LSTM entrenado a TorchScript / ONNX")
+    parser.add_argument("--state",    default=str(STATE_PATH))
+    parser.add_argument("--out-dir",  default=str(MODEL_DIR))
+    parser.add_argument("--seq-len",  type=int, default=60)
+    parser.add_argument("--quantize", action="store_true", default=LSTM_QUANTIZE,
+                        help="cuantización dinámica int8 de LSTM / Linear")
+    parser.add_argument("--onnx",     action="store_true", help="exporta también a ONNX")
+    args = parser.parse_args()
+
+    # Ejecutar después de train_lstm.py; la API lo sirve con LSTM_RUNTIME=torchscript|onnx
+    meta = export_lstm(args.state, args.out_dir, seq_len=args.seq_len,
+                       quantize=args.quantize, onnx=args.onnx)
+    print(f"✅ LSTM exportado ({meta['input_size']}→{meta['hidden_size']}×{meta['num_layers']}): "
+          f"{', '.join(meta['files'].values())}")
+
+if __name__ == "__main__":
+    main()
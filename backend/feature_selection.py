@@ -1,86 +1,188 @@
 #!/usr/bin/env python3
 import os
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 import joblib
 import optuna
+from joblib import Parallel, delayed
 
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LassoCV
 from sklearn.decomposition import PCA
-from statsmodels.stats.outliers_influence import variance_inflation_factor
 
-from src.data.ingestion       import load_and_prepare_data
-from src.data.preprocessing   import preprocess_sales_data
-from src.config               import FREQ
+from src.data.cache           import load_preprocessed_data
+from src.features.redundancy  import correlation_matrix, correlated_pairs, prune_vif
+from src.features.store       import mean_std_features, rolling_features, series_fingerprint
+from src.config               import (FREQ, MAX_TOTAL_WORKERS, FS_WORKERS, FS_MEMO_SIZE,
+                                      FS_STUDY_STORAGE, FS_STUDY_NAME)
+
+# Columnas ya calculadas por (huella de sales, window, alpha): los trials
+# que repiten ventana / alpha no las reconstruyen. LRU acotada a
+# FS_MEMO_SIZE (alpha es continuo en Optuna) y vaciada al terminar cada
+# estudio. El lock solo cubre lecturas / inserciones; el cálculo va fuera.
+_FEATURE_MEMO = OrderedDict()
+_MEMO_LOCK    = threading.Lock()
 
 def smape(y_true, y_pred):
     mask = y_true > 1e-3
     return 100 * np.mean(2 * np.abs(y_true[mask] - y_pred[mask]) /
                         (np.abs(y_true[mask]) + np.abs(y_pred[mask])))
 
+def _split_workers(n_workers=None, n_tasks=None):
+    """(procesos / trials en paralelo, n_jobs del RF dentro de cada uno)."""
+    n_workers = n_workers or FS_WORKERS or MAX_TOTAL_WORKERS
+    n_workers = max(1, min(n_workers, MAX_TOTAL_WORKERS, n_tasks or n_workers))
+    return n_workers, max(1, MAX_TOTAL_WORKERS // n_workers)
+
+def _memo_get(key):
+    with _MEMO_LOCK:
+        value = _FEATURE_MEMO.get(key)
+        if value is not None:
+            _FEATURE_MEMO.move_to_end(key)
+        return value
+
+def _memo_put(key, value):
+    """Inserta si nadie se adelantó (doble comprobación) y devuelve la entrada vigente."""
+    with _MEMO_LOCK:
+        value = _FEATURE_MEMO.setdefault(key, value)
+        _FEATURE_MEMO.move_to_end(key)
+        while len(_FEATURE_MEMO) > max(FS_MEMO_SIZE, 1):
+            _FEATURE_MEMO.popitem(last=False)
+        return value
+
+def clear_feature_memo():
+    with _MEMO_LOCK:
+        _FEATURE_MEMO.clear()
+
+def _memo_features(df, window, alpha=None):
+    fp   = series_fingerprint(df["sales"])
+    base = _memo_get((fp, "base"))
+    if base is None:
+        lower, upper = df["sales"].quantile([0.01, 0.99])
+        base = pd.DataFrame(index=df.index)
+        base["sales_smooth"] = df["sales"].clip(lower, upper)
+        base["sales_log"]    = np.log1p(base["sales_smooth"])
+        base = _memo_put((fp, "base"), base)
+
+    # La EWM solo depende de alpha; window únicamente le da nombre
+    key  = (fp, None, alpha) if alpha is not None else (fp, window, None)
+    cols = _memo_get(key)
+    if cols is None:
+        if alpha is None:
+            features = mean_std_features([window], "rm_{w}", "rstd_{w}", min_periods=1)
+            rolling  = rolling_features("sales_log", base["sales_log"], features)
+            cols = pd.DataFrame({"rm":   rolling[f"rm_{window}"],
+                                 "rstd": rolling[f"rstd_{window}"].fillna(0)})
+        else:
+            # Misma definición que RollingFeature("ewm"), sin pasar por el
+            # store: cada alpha de Optuna es único y así los trials no se serializan
+            ewm  = base["sales_log"].ewm(alpha=alpha, adjust=False, ignore_na=True).mean()
+            cols = pd.DataFrame({"ewm": ewm})
+        cols = _memo_put(key, cols)
+    return base, cols
+
 def create_features(df, window, alpha=None):
+    base, cols = _memo_features(df, window, alpha)
     df = df.copy()
-    lower, upper = df["sales"].quantile([0.01, 0.99])
-    df["sales_smooth"] = df["sales"].clip(lower, upper)
-    df["sales_log"]    = np.log1p(df["sales_smooth"])
+    df["sales_smooth"] = base["sales_smooth"]
+    df["sales_log"]    = base["sales_log"]
     if alpha is None:
-        df[f"rm_{window}"]   = df["sales_log"].rolling(window, min_periods=1).mean()
-        df[f"rstd_{window}"] = df["sales_log"].rolling(window, min_periods=1).std().fillna(0)
+        df[f"rm_{window}"]   = cols["rm"]
+        df[f"rstd_{window}"] = cols["rstd"]
     else:
-        df[f"ewm_{window}"]  = df["sales_log"].ewm(alpha=alpha, adjust=False).mean()
+        df[f"ewm_{window}"]  = cols["ewm"]
     return df
 
-def evaluate_window(df_ts, window, use_ewm=False, alpha=None):
-    df_feat   = create_features(df_ts, window, alpha if use_ewm else None)
-    feat_cols = [c for c in df_feat.columns if c.startswith(("rm_","rstd_","ewm_"))]
-    X         = df_feat[feat_cols].values
-    y_log     = df_feat["sales_log"].values
-    tscv      = TimeSeriesSplit(n_splits=5)
-    scores    = []
+def _cv_smape(X, y_log, n_jobs=-1):
+    tscv   = TimeSeriesSplit(n_splits=5)
+    scores = []
     for tr, va in tscv.split(X):
         Xtr, Xva = X[tr], X[va]
         ytr, yva = y_log[tr], y_log[va]
-        m = RandomForestRegressor(n_estimators=50, random_state=42)
+        m = RandomForestRegressor(n_estimators=50, random_state=42, n_jobs=n_jobs)
         m.fit(Xtr, ytr)
         p = m.predict(Xva)
         scores.append(smape(np.expm1(yva), np.expm1(p)))
     return np.mean(scores)
 
-def grid_search_windows(df_ts):
+def _window_matrix(df_ts, window, use_ewm=False, alpha=None):
+    base, cols = _memo_features(df_ts, window, alpha if use_ewm else None)
+    return cols.to_numpy(), base["sales_log"].to_numpy()
+
+def evaluate_window(df_ts, window, use_ewm=False, alpha=None, n_jobs=-1):
+    X, y_log = _window_matrix(df_ts, window, use_ewm, alpha)
+    return _cv_smape(X, y_log, n_jobs)
+
+def grid_search_windows(df_ts, n_workers=None):
+    """
+    Ventanas rolling y EWM en paralelo (procesos de joblib). Las matrices se
+    calculan una vez en el proceso principal; cada worker solo entrena el RF.
+    """
     windows = [3, 7, 14, 21, 30, 60]
-    res     = {}
-    for w in windows:
-        res[f"rm_std_{w}"] = evaluate_window(df_ts, w, use_ewm=False)
+    configs = {f"rm_std_{w}": (w, False, None) for w in windows}
     for w in windows:
         a = 2/(w+1)
-        res[f"ewm_alpha_{a:.2f}"] = evaluate_window(df_ts, w, use_ewm=True, alpha=a)
+        configs[f"ewm_alpha_{a:.2f}"] = (w, True, a)
+
+    n_workers, rf_jobs = _split_workers(n_workers, len(configs))
+    matrices = [_window_matrix(df_ts, *cfg) for cfg in configs.values()]
+    scores   = Parallel(n_jobs=n_workers)(
+        delayed(_cv_smape)(X, y_log, rf_jobs) for X, y_log in matrices
+    )
+    res  = dict(zip(configs, scores))
     best = min(res, key=res.get)
     return best, res
 
-def bayesian_search(df_ts, n_trials=30):
+def bayesian_search(df_ts, n_trials=30, n_workers=None, storage=None, study_name=None):
+    """
+    Optuna con trials en paralelo (n_jobs, hilos: el RF libera el GIL) y
+    storage persistente: si el estudio existe se reanuda y solo se corren
+    los trials que faltan hasta n_trials. El nombre incluye la huella de
+    la serie para no mezclar estudios de datos distintos.
+    """
+    storage    = FS_STUDY_STORAGE if storage is None else storage
+    study_name = f"{study_name or FS_STUDY_NAME}_{series_fingerprint(df_ts['sales'])[:8]}"
+    if storage.startswith("sqlite:///"):
+        os.makedirs(os.path.dirname(storage[len("sqlite:///"):]) or ".", exist_ok=True)
+
+    n_workers, rf_jobs = _split_workers(n_workers, n_trials)
+
     def obj(trial):
         w = trial.suggest_int("window", 3, 60)
         a = trial.suggest_float("alpha", 0.01, 0.5)
-        return evaluate_window(df_ts, w, use_ewm=True, alpha=a)
-    study = optuna.create_study(direction="minimize")
-    study.optimize(obj, n_trials=n_trials)
+        return evaluate_window(df_ts, w, use_ewm=True, alpha=a, n_jobs=rf_jobs)
+
+    study = optuna.create_study(direction="minimize", study_name=study_name,
+                                storage=storage or None, load_if_exists=True)
+    done  = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)))
+    if done < n_trials:
+        try:
+            study.optimize(obj, n_trials=n_trials - done, n_jobs=n_workers)
+        finally:
+            clear_feature_memo()
     return study.best_params, study.best_value
 
 def remove_redundant_features(df, feature_cols, corr_thresh=0.9, vif_thresh=5.0):
     X = df[feature_cols].copy()
+    # Una sola matriz de correlación (float32, por bloques) para ambos filtros
+    C    = correlation_matrix(X.to_numpy(dtype=np.float64))
+    keep = list(range(X.shape[1]))
+
     dropped_corr = []
     if X.shape[1] > 1:
-        corr = X.corr().abs()
-        upper = corr.where(np.triu(np.ones(corr.shape), k=1).astype(bool))
-        dropped_corr = [c for c in upper.columns if any(upper[c] > corr_thresh)]
+        drop = set(correlated_pairs(C, corr_thresh))
+        keep = [i for i in keep if i not in drop]
+        dropped_corr = [feature_cols[i] for i in sorted(drop)]
         X = X.drop(columns=dropped_corr)
 
+    # VIF iterativo desde la inversa de la correlación (actualizaciones rank-one)
     dropped_vif = []
     if X.shape[1] > 1:
-        vif_vals = [variance_inflation_factor(X.values, i) for i in range(X.shape[1])]
-        dropped_vif = X.columns[np.array(vif_vals) > vif_thresh].tolist()
+        _, dropped, _ = prune_vif(C[np.ix_(keep, keep)], vif_thresh)
+        dropped_vif = [X.columns[i] for i in dropped]
         X = X.drop(columns=dropped_vif)
 
     dropped_lasso = []
@@ -106,8 +208,7 @@ def remove_redundant_features(df, feature_cols, corr_thresh=0.9, vif_thresh=5.0)
     }
 
 if __name__ == "__main__":
-    df_raw = load_and_prepare_data()
-    df_ts  = preprocess_sales_data(df_raw, freq=FREQ)
+    df_ts  = load_preprocessed_data(freq=FREQ)
 
     # 1) Grid Search
     best_w, grid_res = grid_search_windows(df_ts)
@@ -2,6 +2,7 @@
 # backend/main.py
 
 import sys
+import time
 from pathlib import Path
 
 # 1) Inyecta backend/ en el PYTHONPATH para que “src” sea importable
@@ -9,16 +10,21 @@ BASE_DIR = Path(__file__).resolve().parent        # …/IAproyecto/backend
 sys.path.insert(0, str(BASE_DIR))
 
 # 2) Imports
-from fastapi                 import FastAPI, File, UploadFile
+from fastapi                 import FastAPI, File, HTTPException, Query, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses       import JSONResponse
 import pandas                as pd
-import joblib
-import torch
 
 # ahora las importaciones en tu código pueden usar src.* tal como en tus módulos existentes
-from src.config               import FREQ
-from src.models.LSTM_model    import LSTMModel
-from src.models.prophet_model import _add_date_regressors
+from src.config                  import (
+    MODEL_WATCH_INTERVAL, INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE, PREDICT_CHUNK_ROWS,
+    HORIZON_DAYS, FORECAST_MAX_AGE, FORECAST_MAX_HORIZON, PROFILE_DIR,
+)
+from src.serving.batch           import CONTEXT_ROWS, predict_batch
+from src.serving.executor        import InferenceExecutor
+from src.serving.forecasts       import FORECAST_MODELS, ForecastCache
+from src.serving.instrumentation import METRICS, RequestProfiler
+from src.serving.registry        import ModelRegistry
 
 # 3) Crea la app y habilita CORS
 app = FastAPI()
@@ -29,32 +35,110 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 4) Define rutas a tus artefactos
-ARTIFACTS    = BASE_DIR / "models"
-SCALER_PATH  = ARTIFACTS / "lstm_scaler.pkl"
-LSTM_STATE   = ARTIFACTS / "lstm_quantile.pth"
-PROPHET_PATH = ARTIFACTS / "prophet_model.joblib"
-XGB_PATH     = ARTIFACTS / "xgb_residual_adv_fixed.joblib"
-
-# 5) Carga el scaler y el modelo LSTM
-lstm_scaler = joblib.load(SCALER_PATH)
-lstm_model  = LSTMModel(
-    input_size  = lstm_scaler.n_features_in_,
-    hidden_size = 128,    # ajusta a tus hiperparámetros reales
-    num_layers  = 2,
-    dropout     = 0.2,
-)
-state_dict = torch.load(LSTM_STATE, map_location="cpu")
-lstm_model.load_state_dict(state_dict)
-lstm_model.eval()
+# 4) Registro de artefactos: se cargan en la primera petición y se
+#    recargan en caliente cuando cambian los ficheros de models/
+ARTIFACTS = BASE_DIR / "models"
+registry  = ModelRegistry(ARTIFACTS)
+
+# 5) Pool acotado para la inferencia (el event loop queda libre)
+executor  = InferenceExecutor(INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE)
+
+# 6) Forecasts servidos desde memoria; se invalidan al recargar el registro
+forecasts = ForecastCache(registry)
+
+# 7) Instrumentación: métricas Prometheus en /metrics y cProfile opcional
+profiler  = RequestProfiler(BASE_DIR / PROFILE_DIR)
+METRICS.register_gauge("inference_running", "Peticiones ejecutándose en el pool",
+                       lambda: executor.status()["running"])
+METRICS.register_gauge("inference_queued", "Peticiones esperando en el pool",
+                       lambda: executor.status()["queued"])
+METRICS.register_gauge("forecast_cache_hits_total", "Aciertos de la caché de /forecast",
+                       lambda: forecasts.hits, kind="counter")
+METRICS.register_gauge("forecast_cache_misses_total", "Fallos de la caché de /forecast",
+                       lambda: forecasts.misses, kind="counter")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status   = response.status_code
+        return response
+    finally:
+        # Plantilla de la ruta (no la URL) para acotar la cardinalidad
+        route = request.scope.get("route")
+        path  = getattr(route, "path", "other")
+        METRICS.http_seconds.observe(time.perf_counter() - t0, path)
+        METRICS.http_requests.inc(1, path, status)
+
+
+@app.on_event("startup")
+def start_model_watcher():
+    registry.start_watcher(MODEL_WATCH_INTERVAL)
+
+
+@app.on_event("shutdown")
+def stop_services():
+    registry.stop_watcher()
+    executor.shutdown()
+
+
+# 8) Salud, estado y recarga manual de los modelos
+@app.get("/health")
+async def health():
+    return {"status": "ok", "inference": executor.status(), "forecast_cache": forecasts.status()}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Métricas en formato de texto de Prometheus."""
+    return Response(content=METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
-# 6) Carga Prophet y XGBoost
-prophet_model = joblib.load(PROPHET_PATH)
-xgb_model     = joblib.load(XGB_PATH)
 
-# 7) Endpoint para recibir CSV y devolver SOLO LSTM y ENSEMBLE
+@app.get("/models")
+def models_status():
+    return registry.status()
+
+
+@app.post("/models/reload")
+def models_reload(force: bool = False):
+    registry.reload(force=force)
+    return registry.status()
+
+
+# 9) Forecast precalculado por modelo y horizonte (caché + ETag)
+@app.get("/forecast")
+async def forecast(
+    request: Request,
+    horizon: int = Query(min(HORIZON_DAYS, FORECAST_MAX_HORIZON), ge=1, le=FORECAST_MAX_HORIZON),
+    model:   str = Query("ensemble"),
+):
+    """
+    Devuelve {model, horizon, version, forecast: [{date, yhat, yhat_lower, yhat_upper}]}.
+    Un acierto de caché no sale del event loop; si el cliente ya tiene la
+    versión (If-None-Match) responde 304 sin cuerpo.
+    """
+    if model not in FORECAST_MODELS:
+        raise HTTPException(status_code=400, detail=f"model debe ser uno de {list(FORECAST_MODELS)}")
+    entry = forecasts.lookup(model, horizon)
+    if entry is None:
+        try:
+            entry = await executor.run(forecasts.get, model, horizon)
+        except LookupError as exc:
+            raise HTTPException(status_code=404, detail=str(exc))
+
+    headers = {"ETag": entry.etag, "Cache-Control": f"public, max-age={FORECAST_MAX_AGE}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+# 10) Endpoint para recibir CSV y devolver SOLO LSTM y ENSEMBLE
 @app.post("/predict-csv")
-async def predict_csv(file: UploadFile = File(...)):
+async def predict_csv(request: Request, file: UploadFile = File(...)):
     """
     - Espera un multipart/form-data con un CSV que tenga columnas:
         'fecha'         (YYYY-MM-DD)
@@ -63,34 +147,37 @@ async def predict_csv(file: UploadFile = File(...)):
     - Devuelve JSON con las predicciones de:
         • lstm
         • ensemble (lstm + prophet + xgb_residual)
+        • yhat_lower / yhat_upper (cuantiles extremos del LSTM)
+    - Con PROFILE_ENABLED y la cabecera X-Profile: 1 se perfila la petición;
+      la cabecera X-Profile-File de la respuesta indica el volcado .prof
+      (ausente si otra petición se estaba perfilando).
     """
-    df = pd.read_csv(file.file)
-    results = []
+    if not profiler.wanted(request.headers):
+        results = await executor.run(score_upload, file.file)
+        return {"predictions": results}
+    results, path = await executor.run(profiler.call, "predict-csv", score_upload, file.file)
+    headers = {"X-Profile-File": path.name} if path is not None else {}
+    return JSONResponse({"predictions": results}, headers=headers)
+
 
-    for _, row in df.iterrows():
-        fecha          = row["fecha"]
-        ventas_previas = row["ventas_previas"]
-        otras_vars     = row["otras_vars"]
-
-        # — LSTM —
-        arr    = lstm_scaler.transform([[ventas_previas, otras_vars]])
-        tensor = torch.tensor(arr, dtype=torch.float32).unsqueeze(0)
-        with torch.no_grad():
-            p_lstm = lstm_model(tensor).item()
-
-        # — Prophet + XGB residual (para el ensemble) —
-        tmp    = pd.DataFrame({"ds": [fecha]})
-        tmp    = _add_date_regressors(tmp)
-        p_prop = prophet_model.predict(tmp)["yhat"].iloc[0]
-        p_xgb  = xgb_model.predict(pd.DataFrame({"prophet": [p_prop]}))[0]
-
-        # — Ensamble final —
-        p_ens = p_lstm + p_prop + p_xgb
-
-        results.append({
-            "fecha":    fecha,
-            "lstm":     p_lstm,
-            "ensemble": p_ens
-        })
-
-    return {"predictions": results}
+def score_upload(fileobj) -> list:
+    """
+    Corre en el pool de inferencia: parsea el CSV por chunks y puntúa cada
+    uno con el motor batch, sin cargar el fichero entero de una vez. La cola
+    de cada chunk es el contexto de las ventanas rodantes del siguiente.
+    """
+    bundle  = registry.get()
+    results = []
+    context = None
+    reader  = pd.read_csv(fileobj, chunksize=PREDICT_CHUNK_ROWS)
+    while True:
+        with METRICS.stage("csv_parse"):
+            chunk = next(reader, None)
+        if chunk is None:
+            break
+        results.extend(
+            predict_batch(chunk, bundle.lstm_scaler, bundle.lstm, bundle.prophet, bundle.xgb, context)
+        )
+        context = pd.concat([context, chunk]).tail(CONTEXT_ROWS) if CONTEXT_ROWS else None
+    METRICS.request_rows.observe(len(results))
+    return results
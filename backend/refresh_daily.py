@@ -0,0 +1,18 @@
+# refresh_daily.py
+
+#!/usr/bin/env python3
+
+import sys
+from src.config import DATA_PATH, FREQ
+from src.data.incremental import update_daily_store
+
+def main():
+    # Uso: python refresh_daily.py <delta.csv>   (sin argumento: DATA_PATH, p.ej. para inicializar)
+    # Con USE_DAILY_STORE=true, train / evaluate / backtest leen la serie de
+    # este agregado vía load_preprocessed_data en lugar de reparsear el CSV
+    delta = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    df_ts = update_daily_store(delta, freq=FREQ)
+    print(f"✅ Serie diaria actualizada: {len(df_ts)} periodos, último {df_ts.index.max().date()}")
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,21 @@ load_dotenv()
 
 # — Rutas de datos ——————————————————————————————
 DATA_PATH = os.getenv("DATA_PATH", "./src/data/train.csv")
+# Filas por chunk al leer el CSV en streaming (0 = lectura completa)
+INGEST_CHUNKSIZE = int(os.getenv("INGEST_CHUNKSIZE", "0"))
+# Caché columnar de la serie preprocesada (requiere pyarrow)
+CACHE_DIR      = os.getenv("CACHE_DIR", "./.cache")
+USE_DATA_CACHE = os.getenv("USE_DATA_CACHE", "true").lower() == "true"
+# Persistir en CACHE_DIR los forecasts de Prophet memoizados
+FORECAST_CACHE_PERSIST = os.getenv("FORECAST_CACHE_PERSIST", "false").lower() == "true"
+# Forecasts de Prophet que se conservan en memoria por proceso (LRU)
+FORECAST_MEMORY_SIZE = int(os.getenv("FORECAST_MEMORY_SIZE", "16"))
+# Persistir en CACHE_DIR la matriz de features del XGB de residuos (.npy memory-mapped)
+XGB_FEATURE_CACHE = os.getenv("XGB_FEATURE_CACHE", "true").lower() == "true"
+# Agregado diario persistido para la ingesta incremental (deltas de pedidos)
+DAILY_STORE_DIR = os.getenv("DAILY_STORE_DIR", "./models/daily_store")
+# Leer la serie de train / evaluate desde ese agregado (refresh_daily.py) en vez del CSV
+USE_DAILY_STORE = os.getenv("USE_DAILY_STORE", "false").lower() == "true"
 
 # — Horario de series ———————————————————————————
 # Frecuencia para resample y forecast ("D","W","M",...)
@@ -24,3 +39,82 @@ CP_PRIOR_SCALES             = [float(x) for x in os.getenv("CP_PRIOR_SCALES", "0
 SEASONALITY_PRIOR_SCALES    = [float(x) for x in os.getenv("SEASONALITY_PRIOR_SCALES", "0.01,0.1,0.5,1.0").split(",")]
 CHANGEPNT_RANGE             = float(os.getenv("CHANGEPNT_RANGE", "0.8"))
 LOG_TRANSFORM               = os.getenv("LOG_TRANSFORM", "false").lower() == "true"
+# Simulaciones de incertidumbre en el modo de predicción "reduced"
+PROPHET_REDUCED_SAMPLES     = int(os.getenv("PROPHET_REDUCED_SAMPLES", "100"))
+# Reentrenar desde los parámetros del prophet_model.joblib previo (sin grid search)
+PROPHET_WARM_START          = os.getenv("PROPHET_WARM_START", "false").lower() == "true"
+
+# — Modo panel (una serie por combinación de claves) ———————
+PANEL_KEYS      = [k for k in os.getenv("PANEL_KEYS", "Region,Category").split(",") if k]
+PANEL_MODEL_DIR = os.getenv("PANEL_MODEL_DIR", "./models/panel")
+# Procesos para ajustar series en paralelo (0 = MAX_TOTAL_WORKERS)
+PANEL_WORKERS   = int(os.getenv("PANEL_WORKERS", "0"))
+
+# — Servicio / API ——————————————————————————————
+# Segundos entre sondeos de backend/models/ para recarga en caliente (0 = desactivado)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "10"))
+# Hilos de inferencia y peticiones que pueden esperar en cola (luego 429)
+INFERENCE_WORKERS    = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "8"))
+# Filas por chunk al parsear y puntuar un CSV subido
+PREDICT_CHUNK_ROWS   = int(os.getenv("PREDICT_CHUNK_ROWS", "50000"))
+# Respuestas de GET /forecast en memoria (LRU) y max-age del Cache-Control
+FORECAST_CACHE_SIZE  = int(os.getenv("FORECAST_CACHE_SIZE", "64"))
+FORECAST_MAX_AGE     = int(os.getenv("FORECAST_MAX_AGE", "60"))
+# Horizonte máximo aceptado por GET /forecast (cada horizonte distinto es un predict)
+FORECAST_MAX_HORIZON = int(os.getenv("FORECAST_MAX_HORIZON", str(HORIZON_DAYS)))
+# Runtime del LSTM en la API: "eager" (.pth), "torchscript" (.ts) u "onnx" (ver export_lstm.py)
+LSTM_RUNTIME         = os.getenv("LSTM_RUNTIME", "eager").lower()
+# Hilos intra-op para la inferencia del LSTM (0 = valor por defecto de torch / onnxruntime)
+LSTM_THREADS         = int(os.getenv("LSTM_THREADS", "0"))
+# Cuantización dinámica int8 (LSTM / Linear) al exportar a TorchScript
+LSTM_QUANTIZE        = os.getenv("LSTM_QUANTIZE", "false").lower() == "true"
+# Perfilado cProfile por petición: con PROFILE_ENABLED, la cabecera X-Profile: 1
+# lo activa; PROFILE_SAMPLE_RATE perfila además esa fracción de peticiones al azar
+PROFILE_ENABLED      = os.getenv("PROFILE_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE  = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR          = os.getenv("PROFILE_DIR", "profiles")
+# Volcados .prof que se conservan en PROFILE_DIR (se borran los más antiguos)
+PROFILE_MAX_FILES    = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+# — Paralelismo ————————————————————————————————
+# Tope global de procesos (pool externo × paralelismo interno)
+MAX_TOTAL_WORKERS    = int(os.getenv("MAX_TOTAL_WORKERS", str(os.cpu_count() or 1)))
+# Procesos del grid search de Prophet (0 = tantos como permita el tope)
+TUNE_WORKERS         = int(os.getenv("TUNE_WORKERS", "0"))
+# Poda: folds mínimos antes de descartar y margen sobre el mejor MAPE
+TUNE_PRUNE_MIN_FOLDS = int(os.getenv("TUNE_PRUNE_MIN_FOLDS", "2"))
+TUNE_PRUNE_TOLERANCE = float(os.getenv("TUNE_PRUNE_TOLERANCE", "0.1"))
+# Hilos del XGB de residuos (tree_method="hist"; 0 = todos los núcleos)
+XGB_N_JOBS           = int(os.getenv("XGB_N_JOBS", "0"))
+# Procesos para los folds del backtesting (0 = MAX_TOTAL_WORKERS)
+BACKTEST_WORKERS     = int(os.getenv("BACKTEST_WORKERS", "0"))
+
+# — Selección de features (feature_selection.py) ——————————
+# Configuraciones / trials en paralelo (0 = MAX_TOTAL_WORKERS); el RF usa el resto de núcleos
+FS_WORKERS           = int(os.getenv("FS_WORKERS", "0"))
+# Entradas máximas de la memo de columnas (ventana / alpha) entre trials
+FS_MEMO_SIZE         = int(os.getenv("FS_MEMO_SIZE", "64"))
+# Storage de Optuna para reanudar la búsqueda ("" = en memoria)
+FS_STUDY_STORAGE     = os.getenv("FS_STUDY_STORAGE", "sqlite:///models/feature_selection.db")
+FS_STUDY_NAME        = os.getenv("FS_STUDY_NAME", "ewm_window")
+
+# — Entrenamiento del LSTM ————————————————————————
+# Longitud de la ventana de entrada y pasos que predice la cabeza directa
+LSTM_SEQ_LEN         = int(os.getenv("LSTM_SEQ_LEN", "60"))
+LSTM_HORIZON         = int(os.getenv("LSTM_HORIZON", str(HORIZON_DAYS)))
+# Cuantiles que emite la red (ordenados, con la mediana en el centro; "" = solo el punto)
+LSTM_QUANTILES       = [float(x) for x in os.getenv("LSTM_QUANTILES", "0.1,0.5,0.9").split(",") if x.strip()]
+LSTM_BATCH_SIZE      = int(os.getenv("LSTM_BATCH_SIZE", "128"))
+# Hilos intra-op de torch al entrenar (0 = valor por defecto de torch)
+LSTM_TRAIN_THREADS   = int(os.getenv("LSTM_TRAIN_THREADS", "0"))
+# Workers del DataLoader (0 = en el proceso principal)
+LSTM_LOADER_WORKERS  = int(os.getenv("LSTM_LOADER_WORKERS", "0"))
+# Autocast bf16 (CPU con soporte AVX512-BF16 / AMX) y torch.compile del modelo
+LSTM_BF16            = os.getenv("LSTM_BF16", "false").lower() == "true"
+LSTM_COMPILE         = os.getenv("LSTM_COMPILE", "false").lower() == "true"
+
+# — Backtesting (rolling origin) ——————————————————
+BACKTEST_INITIAL     = int(os.getenv("BACKTEST_INITIAL", "730"))   # periodos del primer entrenamiento
+BACKTEST_STEP        = int(os.getenv("BACKTEST_STEP", "90"))       # avance entre cortes
+BACKTEST_LSTM_EPOCHS = int(os.getenv("BACKTEST_LSTM_EPOCHS", "30"))
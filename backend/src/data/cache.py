@@ -0,0 +1,150 @@
+# src/data/cache.py
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import IO, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.config import CACHE_DIR, DATA_PATH, FREQ, USE_DAILY_STORE, USE_DATA_CACHE
+from src.data import preprocessing
+from src.data.ingestion import load_and_prepare_data
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # sin pyarrow la caché queda desactivada
+    feather = None
+
+# Súbelo si cambia el formato de lo que se guarda
+CACHE_VERSION = 1
+
+
+def file_fingerprint(path: Union[str, Path], block_size: int = 1 << 20) -> str:
+    """
+    Hash del contenido del fichero (lectura por bloques, sin parsear).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def make_key(**parts) -> str:
+    """
+    Clave estable a partir de un dict serializable.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def cache_path(name: Union[str, Path]) -> Path:
+    """Un nombre (str) vive en CACHE_DIR; un Path se usa tal cual."""
+    return name if isinstance(name, Path) else Path(CACHE_DIR) / name
+
+
+def write_frame(df: pd.DataFrame, name: Union[str, Path]) -> Optional[Path]:
+    """
+    Guarda df en Feather sin compresión (apto para memory-map).
+    Escritura atómica: fichero temporal + rename.
+    """
+    if feather is None:
+        return None
+    path = cache_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    return path
+
+
+def read_frame(name: Union[str, Path]) -> Optional[pd.DataFrame]:
+    """
+    Lee un frame cacheado con memory-map; None si no existe.
+    """
+    path = cache_path(name)
+    if feather is None or not path.exists():
+        return None
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def write_array(arr: np.ndarray, name: Union[str, Path], meta: dict = None) -> Path:
+    """
+    Guarda arr como .npy (apto para memory-map) y meta junto a él en
+    <name>.json. Escritura atómica de ambos ficheros.
+    """
+    path = cache_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(arr))
+    meta_path = path.with_suffix(path.suffix + ".json")
+    meta_tmp  = meta_path.with_suffix(meta_path.suffix + f".{os.getpid()}.tmp")
+    meta_tmp.write_text(json.dumps(meta or {}, default=str))
+    os.replace(meta_tmp, meta_path)
+    os.replace(tmp, path)
+    return path
+
+
+def read_array(name: Union[str, Path]) -> Optional[tuple]:
+    """
+    (array memory-mapped de solo lectura, meta) o None si no existe.
+    """
+    path      = cache_path(name)
+    meta_path = path.with_suffix(path.suffix + ".json")
+    if not path.exists() or not meta_path.exists():
+        return None
+    return np.load(path, mmap_mode="r"), json.loads(meta_path.read_text())
+
+
+def preprocessing_key(source: Union[str, Path], freq: str) -> str:
+    return make_key(
+        version=CACHE_VERSION,
+        source=file_fingerprint(source),
+        freq=freq,
+        interp=preprocessing.INTERP_METHOD,
+        median_window=preprocessing.MEDIAN_WINDOW,
+        winsor=list(preprocessing.WINSOR_QUANTILES),
+    )
+
+
+def load_preprocessed_data(
+    source: Union[str, IO] = None,
+    freq: str = None,
+    use_cache: bool = None,
+    use_store: bool = None,
+) -> pd.DataFrame:
+    """
+    load_and_prepare_data + preprocess_sales_data con caché por contenido:
+    si el CSV y los parámetros no cambiaron se lee el Feather y no se parsea el CSV.
+    Con use_store (USE_DAILY_STORE) y sin source explícito, la serie sale del
+    agregado incremental que mantiene refresh_daily.py; si aún no existe se
+    lee el CSV como siempre.
+    """
+    path      = source or DATA_PATH
+    fr        = freq or FREQ
+    use_cache = USE_DATA_CACHE if use_cache is None else use_cache
+    use_store = USE_DAILY_STORE if use_store is None else use_store
+
+    if use_store and source is None:
+        from src.data.incremental import load_daily_store  # incremental importa este módulo
+        df_ts = load_daily_store(freq=fr)
+        if df_ts is not None:
+            return df_ts
+        print("⚠️  USE_DAILY_STORE sin agregado (ejecuta refresh_daily.py); se lee el CSV")
+
+    cacheable = use_cache and feather is not None and isinstance(path, (str, Path))
+    if not cacheable:
+        return preprocessing.preprocess_sales_data(load_and_prepare_data(path), freq=fr)
+
+    name   = f"daily_{preprocessing_key(path, fr)}.feather"
+    cached = read_frame(name)
+    if cached is not None:
+        return cached.set_index("date").asfreq(fr)
+
+    df_ts = preprocessing.preprocess_sales_data(load_and_prepare_data(path), freq=fr)
+    write_frame(df_ts.reset_index(), name)
+    return df_ts
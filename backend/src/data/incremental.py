@@ -0,0 +1,165 @@
+# src/data/incremental.py
+
+import json
+import time
+import pandas as pd
+from pathlib import Path
+from typing import IO, Optional, Union
+
+from src.config import DAILY_STORE_DIR, FREQ
+from src.data import cache
+from src.data.ingestion import load_sales_data
+from src.data.preprocessing import INTERP_METHOD, MEDIAN_WINDOW, WINSOR_QUANTILES
+
+# Ficheros del agregado persistido. bins / interp llevan la generación en el
+# nombre (bins.<gen>.feather) y watermark.json, que se escribe el último,
+# apunta a la generación vigente: un corte a mitad de escritura deja el
+# estado anterior intacto y el delta se vuelve a aplicar una sola vez.
+BINS_FILE      = "bins.feather"       # suma y nº de días con datos por periodo
+INTERP_FILE    = "interp.feather"     # serie tras pasos 1-2 (antes de winsorizar)
+WATERMARK_FILE = "watermark.json"
+
+
+def _generation_file(name: str, generation: Optional[int]) -> str:
+    # Stores previos a las generaciones usan los nombres sin sello
+    if generation is None:
+        return name
+    stem, ext = name.split(".", 1)
+    return f"{stem}.{generation}.{ext}"
+
+
+def _bin_daily(df_daily: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """
+    Suma y conteo por periodo, igual que el resample de preprocess_sales_data.
+    Ambas cantidades son aditivas, así que un delta se suma sin releer el histórico.
+    """
+    if df_daily.empty:
+        return pd.DataFrame(columns=["sales_sum", "count"], index=pd.DatetimeIndex([], name="date"))
+    s = df_daily.assign(date=pd.to_datetime(df_daily["date"])).set_index("date")["sales"]
+    r = s.sort_index().resample(freq)
+    return pd.DataFrame({"sales_sum": r.sum(), "count": r.count()})
+
+
+def _interpolate(raw: pd.Series) -> pd.Series:
+    """Pasos 1-2 de preprocess_sales_data (interpolación + mediana centrada)."""
+    out = raw.interpolate(method=INTERP_METHOD, limit_direction="both")
+    return out.fillna(out.rolling(window=MEDIAN_WINDOW, min_periods=1, center=True).median())
+
+
+def _winsorize(interp: pd.Series) -> pd.DataFrame:
+    """Paso 3: cuantiles sobre la serie diaria completa (O(días), vectorizado)."""
+    low, high = interp.quantile(WINSOR_QUANTILES[0]), interp.quantile(WINSOR_QUANTILES[1])
+    return interp.clip(lower=low, upper=high).rename("sales").to_frame()
+
+
+def _read_state(store: Path):
+    meta_path = store / WATERMARK_FILE
+    if not meta_path.exists():
+        return None, None, None
+    meta       = json.loads(meta_path.read_text())
+    generation = meta.get("generation")
+    bins   = cache.read_frame(store / _generation_file(BINS_FILE, generation))
+    interp = cache.read_frame(store / _generation_file(INTERP_FILE, generation))
+    if bins is None or interp is None:
+        return None, None, None
+    return bins.set_index("date"), interp.set_index("date")["sales"], meta
+
+
+def _write_state(store: Path, bins: pd.DataFrame, interp: pd.Series, meta: dict) -> None:
+    """
+    Escribe una generación nueva de bins / interp y solo después publica el
+    watermark que la referencia (tmp + replace); luego borra las anteriores.
+    """
+    if cache.feather is None:
+        raise RuntimeError("La ingesta incremental necesita pyarrow instalado")
+    previous   = meta.get("generation")
+    generation = (previous or 0) + 1
+    files      = [_generation_file(BINS_FILE, generation), _generation_file(INTERP_FILE, generation)]
+    cache.write_frame(bins.rename_axis("date").reset_index(), store / files[0])
+    cache.write_frame(interp.rename("sales").rename_axis("date").reset_index(), store / files[1])
+
+    meta = {**meta, "generation": generation}
+    tmp  = store / (WATERMARK_FILE + ".tmp")
+    tmp.write_text(json.dumps(meta, indent=2))
+    tmp.replace(store / WATERMARK_FILE)
+
+    # Generaciones huérfanas (anteriores o de escrituras interrumpidas)
+    for pattern in ("bins*.feather", "interp*.feather"):
+        for path in store.glob(pattern):
+            if path.name not in files:
+                path.unlink(missing_ok=True)
+
+
+def load_daily_store(store_dir: Union[str, Path] = None, freq: str = None) -> Optional[pd.DataFrame]:
+    """
+    Serie preprocesada (mismo formato que preprocess_sales_data) a partir
+    del agregado persistido; None si todavía no existe. Con freq se
+    comprueba que el store esté agregado a esa frecuencia.
+    """
+    store = Path(store_dir or DAILY_STORE_DIR)
+    bins, interp, meta = _read_state(store)
+    if interp is None:
+        return None
+    if freq is not None and meta["freq"] != freq:
+        raise ValueError(f"El store está agregado con freq={meta['freq']!r}, no {freq!r}")
+    return _winsorize(interp.asfreq(meta["freq"]))
+
+
+def update_daily_store(
+    delta_source: Union[str, IO],
+    store_dir: Union[str, Path] = None,
+    freq: str = None,
+    chunksize: int = None,
+) -> pd.DataFrame:
+    """
+    Integra un CSV de pedidos nuevos en el agregado diario persistido y
+    devuelve la serie preprocesada. Solo se parsea el delta; la interpolación
+    se rehace desde el último periodo observado anterior al delta.
+    Si el store no existe, el delta hace de histórico completo.
+    Un mismo fichero (por contenido) no se aplica dos veces.
+    """
+    store = Path(store_dir or DAILY_STORE_DIR)
+    fr    = freq or FREQ
+    old_bins, old_interp, meta = _read_state(store)
+    if meta is not None and meta["freq"] != fr:
+        raise ValueError(f"El store está agregado con freq={meta['freq']!r}, no {fr!r}")
+    meta = meta or {"freq": fr, "watermark": None, "deltas": []}
+
+    fingerprint = None
+    if isinstance(delta_source, (str, Path)):
+        fingerprint = cache.file_fingerprint(delta_source)
+        if fingerprint in meta["deltas"]:
+            print(f"↩️  Delta ya aplicado ({fingerprint}), sin cambios")
+            return load_daily_store(store)
+
+    # 1) Agregar solo el delta y sumarlo a los periodos persistidos
+    delta = _bin_daily(load_sales_data(delta_source, chunksize=chunksize), fr)
+    delta = delta[delta["count"] > 0]
+    if delta.empty:
+        return load_daily_store(store)
+
+    bins = delta if old_bins is None else old_bins.add(delta, fill_value=0)
+    bins = bins.sort_index().asfreq(fr, fill_value=0)
+    bins["count"] = bins["count"].astype(int)
+    raw  = bins["sales_sum"].where(bins["count"] > 0)
+
+    # 2) Re-derivar solo la cola afectada: desde el último periodo con
+    #    datos anterior al delta (ancla) la interpolación no cambia hacia atrás
+    first_affected = delta.index.min()
+    observed_prev  = raw[raw.index < first_affected].dropna()
+    if old_interp is None or observed_prev.empty:
+        interp = _interpolate(raw)
+    else:
+        anchor = observed_prev.index[-1]
+        head   = old_interp[old_interp.index < anchor]
+        interp = pd.concat([head, _interpolate(raw.loc[anchor:])])
+
+    # 3) Watermark y persistencia
+    meta["watermark"]  = str(raw.dropna().index.max().date())
+    meta["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    meta["last_delta"] = {"rows": int(delta["count"].sum()), "from": str(first_affected.date())}
+    if fingerprint is not None:
+        meta["deltas"].append(fingerprint)
+    _write_state(store, bins, interp, meta)
+
+    return _winsorize(interp.asfreq(fr))
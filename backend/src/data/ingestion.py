@@ -1,18 +1,60 @@
+import math
 import pandas as pd
-from typing import IO, Union
-from src.config import DATA_PATH
+from typing import IO, Iterator, List, Union
+from src.config import DATA_PATH, INGEST_CHUNKSIZE
 
 # Ahora solo validamos que existan estas columnas
 REQUIRED_COLUMNS = ["Order Date", "Sales"]
+# Columnas que se leen en modo streaming (Profit es opcional)
+STREAM_COLUMNS = {"Order Date": str, "Sales": "float64", "Profit": "float64"}
 
-def load_sales_data(source: Union[str, IO] = None) -> pd.DataFrame:
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.1
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+
+def _exact_partials(values: List[float]) -> List[float]:
+    """
+    Parciales sin solapamiento (algoritmo de Shewchuk, el de math.fsum)
+    cuya suma exacta es la de values: acumular chunk a chunk sobre ellos
+    no pierde precisión y math.fsum(parciales) da la suma bien redondeada.
+    """
+    partials = []
+    for x in values:
+        i = 0
+        for y in partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                partials[i] = lo
+                i += 1
+            x = hi
+        partials[i:] = [x]
+    return partials
+
+
+def load_sales_data(
+    source: Union[str, IO] = None,
+    chunksize: int = None,
+    keys: List[str] = None,
+) -> pd.DataFrame:
     """
     Lee el CSV (Superstore), renombra columnas a date/sales,
     agrupa ventas diarias y, si existe Profit, también agrupa profit.
+    Con chunksize (o INGEST_CHUNKSIZE) > 0 lee en streaming con memoria acotada.
+    Con keys (p.ej. ["Region", "Category"]) agrupa por keys + date (modo panel).
     """
     path = source or DATA_PATH
+    keys = list(keys or [])
+    chunksize = INGEST_CHUNKSIZE if chunksize is None else chunksize
+    if chunksize and chunksize > 0:
+        return _load_sales_data_chunked(path, chunksize, keys)
+
     df = pd.read_csv(path)
-    missing = set(REQUIRED_COLUMNS) - set(df.columns)
+    missing = set(REQUIRED_COLUMNS + keys) - set(df.columns)
     if missing:
         raise ValueError(f"Faltan columnas en el CSV: {missing}")
 
@@ -36,9 +78,80 @@ def load_sales_data(source: Union[str, IO] = None) -> pd.DataFrame:
     agg_dict = {"sales": "sum"}
     if "profit" in df.columns:
         agg_dict["profit"] = "sum"
-    df_daily = df.groupby("date", as_index=False).agg(agg_dict)
+    df_daily = df.groupby(keys + ["date"], as_index=False).agg(agg_dict)
     return df_daily
 
+
+def iter_sales_chunks(
+    source: Union[str, IO],
+    chunksize: int,
+    keys: List[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Generador de chunks con solo Order Date / Sales / Profit (+ keys) y dtypes explícitos.
+    """
+    keys   = list(keys or [])
+    dtypes = {**STREAM_COLUMNS, **{k: str for k in keys}}
+    reader = pd.read_csv(
+        source,
+        usecols=lambda c: c in dtypes,
+        dtype=dtypes,
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            missing = set(REQUIRED_COLUMNS + keys) - set(chunk.columns)
+            if missing:
+                raise ValueError(f"Faltan columnas en el CSV: {missing}")
+            yield chunk
+
+
+def _load_sales_data_chunked(
+    source: Union[str, IO],
+    chunksize: int,
+    keys: List[str] = None,
+) -> pd.DataFrame:
+    """
+    Igual que load_sales_data pero acumulando las sumas diarias chunk a chunk:
+    la memoria queda acotada por chunksize + número de días distintos.
+    Cada suma diaria se acumula en parciales exactos (math.fsum), así que el
+    resultado no depende de chunksize; frente a la carga completa
+    (groupby.sum) puede diferir como mucho en el redondeo final.
+    """
+    date_format = None
+    sums = {}   # (keys..., date) → {columna: parciales exactos}
+    cols = ["sales"]
+    keys = list(keys or [])
+    for chunk in iter_sales_chunks(source, chunksize, keys):
+        chunk = chunk.rename(columns={"Order Date": "date", "Sales": "sales", "Profit": "profit"})
+
+        # El formato se infiere una sola vez (primer valor no nulo), como
+        # hace pd.to_datetime sobre la columna completa.
+        if date_format is None:
+            first = chunk["date"].dropna()
+            if not first.empty:
+                date_format = guess_datetime_format(first.iloc[0])
+        chunk["date"] = pd.to_datetime(chunk["date"], format=date_format, errors="coerce")
+
+        subset = ["date", "sales"] + (["profit"] if "profit" in chunk.columns else [])
+        chunk  = chunk.dropna(subset=subset)
+
+        # Combinar con los parciales previos de cada día no introduce redondeo
+        cols   = subset[1:]
+        groups = chunk.groupby(keys + ["date"])[cols].agg(list)
+        for key, values in zip(groups.index, groups.to_dict("records")):
+            acc = sums.setdefault(key, {})
+            for c in cols:
+                acc[c] = _exact_partials(acc.get(c, []) + values[c])
+
+    if not sums:
+        return pd.DataFrame(columns=keys + ["date", "sales"])
+    index = (pd.MultiIndex.from_tuples(list(sums), names=keys + ["date"]) if keys
+             else pd.Index(list(sums), name="date"))
+    daily = pd.DataFrame([{c: math.fsum(acc[c]) for c in cols} for acc in sums.values()], index=index)
+    return daily.sort_index().reset_index()
+
+
 def clean_sales_data(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
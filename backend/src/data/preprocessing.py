@@ -4,6 +4,11 @@ import pandas as pd
 import numpy as np
 from src.config import LOG_TRANSFORM, FREQ
 
+# Parámetros del preprocesado (forman parte de la clave de caché)
+INTERP_METHOD    = "linear"
+MEDIAN_WINDOW    = 7
+WINSOR_QUANTILES = (0.01, 0.99)
+
 def apply_log_transform(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     if LOG_TRANSFORM:
@@ -34,20 +39,20 @@ def preprocess_sales_data(df: pd.DataFrame, freq: str = None) -> pd.DataFrame:
     # 1) Interpolación lineal
     df_resampled = df_resampled.to_frame()
     df_resampled["sales"] = df_resampled["sales"].interpolate(
-        method="linear", limit_direction="both"
+        method=INTERP_METHOD, limit_direction="both"
     )
 
     # 2) Seasonal median fill (ventana 7 días centrada)
     df_resampled["sales"] = df_resampled["sales"].fillna(
         df_resampled["sales"]
-          .rolling(window=7, min_periods=1, center=True)
+          .rolling(window=MEDIAN_WINDOW, min_periods=1, center=True)
           .median()
     )
 
     # 3) Winsorizar outliers 1%–99%
     low, high = (
-        df_resampled["sales"].quantile(0.01),
-        df_resampled["sales"].quantile(0.99)
+        df_resampled["sales"].quantile(WINSOR_QUANTILES[0]),
+        df_resampled["sales"].quantile(WINSOR_QUANTILES[1])
     )
     df_resampled["sales"] = df_resampled["sales"].clip(lower=low, upper=high)
 
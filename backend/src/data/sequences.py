@@ -0,0 +1,34 @@
+# src/data/sequences.py
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+
+class SequenceDataset(Dataset):
+    """
+    Ventanas (X[i:i+seq_len], y[i+seq_len : i+seq_len+horizon]) sobre la
+    matriz escalada sin construir el array 3-D [n, seq_len, features]: la
+    matriz se guarda una sola vez en float32 y __getitem__ devuelve slices
+    (vistas) de ella. Solo el batch que arma el DataLoader llega a copiarse.
+    Con horizon=1 el objetivo es un escalar, como en el modelo de un paso.
+    """
+
+    def __init__(self, data: np.ndarray, seq_len: int, target_idx: int, horizon: int = 1):
+        self.data       = torch.from_numpy(np.ascontiguousarray(data, dtype=np.float32))
+        self.seq_len    = seq_len
+        self.target_idx = target_idx
+        self.horizon    = horizon
+
+    def __len__(self) -> int:
+        return max(0, self.data.shape[0] - self.seq_len - self.horizon + 1)
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start = i + self.seq_len
+        if self.horizon == 1:
+            return self.data[i:start], self.data[start, self.target_idx]
+        return self.data[i:start], self.data[start:start + self.horizon, self.target_idx]
@@ -0,0 +1,230 @@
+# src/evaluation/backtest.py
+
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import torch
+from pathlib import Path
+from typing import List, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.preprocessing import MinMaxScaler
+from torch.utils.data import Subset
+
+from src.config import (
+    BACKTEST_INITIAL, BACKTEST_LSTM_EPOCHS, BACKTEST_STEP, BACKTEST_WORKERS,
+    FREQ, HORIZON_DAYS, LSTM_SEQ_LEN, MAX_TOTAL_WORKERS,
+)
+from src.data.preprocessing import inverse_log_transform
+from src.data.sequences import SequenceDataset
+from src.evaluation.metrics import score_frame
+from src.features.lstm_features import LSTM_FEATURES, enrich_features, sales_clip_bounds
+from src.models.LSTM_model import quantile_bands
+from src.models.ensemble import _feature_matrix, _fit_residual_model, _frame, _rows
+from src.models.forecast_cache import prophet_forecast
+from src.models.lstm_training import fit_lstm, unscale_target
+from src.models.prophet_model import train_prophet
+
+MODELS  = ("prophet", "ensemble", "lstm")
+SEQ_LEN = LSTM_SEQ_LEN
+
+# Datos compartidos por los folds de un proceso (ver _init_backtest_worker)
+_SHARED = {}
+
+
+def rolling_origins(n: int, initial: int, horizon: int, step: int) -> List[int]:
+    """
+    Posiciones de corte p: cada fold entrena con [:p] y evalúa [p:p+horizon].
+    """
+    return list(range(initial, n - horizon + 1, step))
+
+
+def _init_backtest_worker(df_ts: pd.DataFrame, n_threads: int) -> None:
+    _SHARED["df_ts"]     = df_ts
+    _SHARED["n_threads"] = n_threads
+    torch.set_num_threads(n_threads)
+
+
+def _prophet_fold(df_train: pd.DataFrame, horizon: int, prophet_kwargs: dict) -> pd.DataFrame:
+    # Modelo temporal por fold; prophet_forecast lo identifica por su hash
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "prophet_model.joblib"
+        m    = train_prophet(df_train, model_path=path, **prophet_kwargs)
+        fc   = prophet_forecast(model=m, periods=horizon, freq=FREQ, model_path=path,
+                                persist=False, mode="components")
+    return fc.set_index("ds")
+
+
+def _ensemble_fold(fc_all: pd.DataFrame, df_train: pd.DataFrame, test_idx: pd.Index) -> np.ndarray:
+    index, cols, values = _feature_matrix(fc_all)
+    hist  = values[_rows(index, df_train.index)]
+    resid = df_train["sales"].to_numpy() - hist[:, 0]
+    xgb   = _fit_residual_model(_frame(hist[:, 1:], cols[1:]), resid, n_jobs=_SHARED["n_threads"])
+
+    test = values[_rows(index, test_idx)]
+    return test[:, 0] + xgb.predict(_frame(test[:, 1:], cols[1:]))
+
+
+def _lstm_fold(df_ts: pd.DataFrame, p: int, horizon: int, epochs: int) -> np.ndarray:
+    # Features con el suavizado y el escalado ajustados solo con [:p]; las
+    # rodantes son causales, así que basta con no pasar de p + horizon
+    bounds     = sales_clip_bounds(df_ts["sales"].iloc[:p])
+    data       = enrich_features(df_ts.iloc[:p + horizon].copy(), clip_bounds=bounds)
+    data       = data[LSTM_FEATURES].to_numpy(dtype=np.float32)
+    scaler     = MinMaxScaler().fit(data[:p])
+    target_idx = LSTM_FEATURES.index("sales_log")
+    dataset    = SequenceDataset(scaler.transform(data), SEQ_LEN, target_idx, horizon=horizon)
+
+    # Ventana i predice las filas [i + SEQ_LEN, i + SEQ_LEN + horizon): para
+    # entrenar solo valen las que terminan antes de p; la de test arranca en p.
+    # Entre train y val se saltan horizon - 1 ventanas para que sus objetivos
+    # no se solapen
+    n_train  = p - SEQ_LEN - horizon + 1
+    split    = int(0.8 * n_train)
+    train_ds = Subset(dataset, range(0, split))
+    val_ds   = Subset(dataset, range(split + horizon - 1, n_train))
+    x_test, _ = dataset[p - SEQ_LEN]
+
+    model, _ = fit_lstm(train_ds, val_ds, input_size=data.shape[1], horizon=horizon,
+                        epochs=epochs, verbose=False)
+    device   = next(model.parameters()).device
+    with torch.no_grad():
+        preds, _, _ = quantile_bands(model(x_test.unsqueeze(0).to(device)))
+
+    return np.expm1(unscale_target(scaler, preds.ravel(), target_idx))
+
+
+def _run_fold(
+    fold: int,
+    p: int,
+    horizon: int,
+    models: Sequence[str],
+    lstm_epochs: int,
+    prophet_kwargs: dict,
+) -> pd.DataFrame:
+    df_ts    = _SHARED["df_ts"]
+    df_train = df_ts.iloc[:p]
+    test_idx = df_ts.index[p:p + horizon]
+    preds    = {}
+
+    # Prophet se ajusta una vez y lo comparten prophet y ensemble
+    if "prophet" in models or "ensemble" in models:
+        fc_all = _prophet_fold(df_train, horizon, prophet_kwargs)
+        if "prophet" in models:
+            preds["prophet"] = inverse_log_transform(fc_all["yhat"].reindex(test_idx)).values
+        if "ensemble" in models:
+            preds["ensemble"] = _ensemble_fold(fc_all, df_train, test_idx)
+    if "lstm" in models:
+        preds["lstm"] = _lstm_fold(df_ts, p, horizon, lstm_epochs)
+
+    y_true = df_ts["sales"].iloc[p:p + horizon].values
+    return pd.concat([
+        pd.DataFrame({
+            "model":   name,
+            "fold":    fold,
+            "cutoff":  df_ts.index[p - 1],
+            "horizon": np.arange(1, len(test_idx) + 1),
+            "date":    test_idx,
+            "y_true":  y_true,
+            "y_pred":  y_pred,
+        })
+        for name, y_pred in preds.items()
+    ], ignore_index=True)
+
+
+def backtest(
+    df_ts: pd.DataFrame,
+    models: Sequence[str] = MODELS,
+    initial: int = None,
+    horizon: int = None,
+    step: int = None,
+    n_workers: int = None,
+    lstm_epochs: int = None,
+    **prophet_kwargs,
+) -> pd.DataFrame:
+    """
+    Backtesting rolling-origin de Prophet, el ensemble XGB de residuos y el
+    LSTM con los mismos cortes. Los folds se reparten en un pool de procesos
+    (n_workers o BACKTEST_WORKERS, acotado por MAX_TOTAL_WORKERS); dentro de
+    un fold el ajuste de Prophet y las features se comparten entre modelos.
+    El LSTM usa la cabeza directa: un forward desde el corte da todo el horizonte.
+    Devuelve las predicciones en formato largo:
+    model, fold, cutoff, horizon, date, y_true, y_pred.
+    Los folds que fallan quedan en preds.attrs["failures"] (fold, cutoff,
+    error); si fallan todos se lanza RuntimeError.
+    """
+    models      = [m for m in MODELS if m in models]
+    initial     = initial or BACKTEST_INITIAL
+    horizon     = horizon or HORIZON_DAYS
+    step        = step or BACKTEST_STEP
+    lstm_epochs = lstm_epochs or BACKTEST_LSTM_EPOCHS
+
+    # Mínimo para que al LSTM le quede validación tras el hueco de horizon - 1
+    if "lstm" in models and initial < SEQ_LEN + 6 * horizon + 10:
+        print(f"⚠️  initial={initial} no deja validación al LSTM; se usa {SEQ_LEN + 6 * horizon + 10}")
+        initial = SEQ_LEN + 6 * horizon + 10
+    cutoffs = rolling_origins(len(df_ts), initial, horizon, step)
+    if not cutoffs:
+        raise ValueError(f"Serie demasiado corta ({len(df_ts)}) para initial={initial}, horizon={horizon}")
+
+    n_workers = n_workers or BACKTEST_WORKERS or MAX_TOTAL_WORKERS
+    n_workers = max(1, min(n_workers, MAX_TOTAL_WORKERS, len(cutoffs)))
+    n_threads = max(1, MAX_TOTAL_WORKERS // n_workers)
+    initargs  = (df_ts, n_threads)
+    args      = (horizon, models, lstm_epochs, prophet_kwargs)
+
+    results  = []
+    failures = []
+    total    = len(cutoffs)
+    t_start  = time.perf_counter()
+
+    def _collect(done, fold, fut_result=None, error=None):
+        if error is None:
+            results.append(fut_result)
+            print(f"[{done}/{total}] fold {fold} ✓")
+        else:
+            failures.append({"fold": fold, "cutoff": df_ts.index[cutoffs[fold] - 1], "error": repr(error)})
+            print(f"[{done}/{total}] fold {fold} ⚠️  {error}")
+
+    if n_workers == 1:
+        _init_backtest_worker(*initargs)
+        for done, (fold, p) in enumerate(enumerate(cutoffs), start=1):
+            try:
+                _collect(done, fold, _run_fold(fold, p, *args))
+            except Exception as exc:
+                _collect(done, fold, error=exc)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_backtest_worker,
+            initargs=initargs,
+        ) as pool:
+            futures = {pool.submit(_run_fold, fold, p, *args): fold for fold, p in enumerate(cutoffs)}
+            for done, fut in enumerate(as_completed(futures), start=1):
+                fold = futures[fut]
+                try:
+                    _collect(done, fold, fut.result())
+                except Exception as exc:
+                    _collect(done, fold, error=exc)
+
+    print(f"⏱️  {total} folds × {len(models)} modelos en {time.perf_counter() - t_start:.1f}s con {n_workers} procesos")
+    if not results:
+        raise RuntimeError(f"Fallaron los {total} folds del backtest; el primero: {failures[0]['error']}")
+    if failures:
+        print(f"⚠️  {len(failures)}/{total} folds fallidos: {sorted(f['fold'] for f in failures)}")
+    preds = pd.concat(results, ignore_index=True).sort_values(["model", "fold", "horizon"], ignore_index=True)
+    preds.attrs["failures"] = sorted(failures, key=lambda f: f["fold"])
+    return preds
+
+
+def score_backtest(preds: pd.DataFrame) -> pd.DataFrame:
+    """
+    Métricas en formato largo por (model, fold) y por (model, horizon):
+    columnas model, level ("fold" | "horizon"), key, n y una por métrica.
+    """
+    frames = []
+    for level, order in (("fold", "horizon"), ("horizon", "fold")):
+        scores = score_frame(preds, ["model", level], order=order).rename(columns={level: "key"})
+        scores.insert(1, "level", level)
+        frames.append(scores)
+    return pd.concat(frames, ignore_index=True)
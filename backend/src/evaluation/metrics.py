@@ -2,45 +2,136 @@
 
 import numpy as np
 import pandas as pd
-from typing import Dict
-from sklearn.metrics import r2_score
+from typing import Dict, List, Union
+
+# Columnas de salida del motor de métricas (mismas claves que evaluate_forecast)
+METRICS = ["MAE", "RMSE", "MAPE (%)", "sMAPE (%)", "MASE", "R2"]
+
+
+def _score_codes(codes: np.ndarray, y_true: np.ndarray, y_pred: np.ndarray, n_groups: int) -> pd.DataFrame:
+    """
+    Núcleo vectorizado: todas las métricas para n_groups grupos en una pasada
+    con np.bincount. codes asigna cada fila a su grupo y las filas de un
+    mismo grupo deben venir en orden temporal (para el naive de MASE).
+    Máscara común: se ignoran las filas con y_true o y_pred no finitos;
+    MAPE ignora además y_true == 0 y sMAPE los denominadores nulos. El
+    naive de MASE solo usa pares de observaciones reales contiguas: un
+    hueco en y_true no se salta uniendo sus vecinos.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    obs    = np.isfinite(y_true)
+    mask   = obs & np.isfinite(y_pred)
+    c, yt, yp = codes[mask], y_true[mask], y_pred[mask]
+
+    def gsum(weights=None, sel=None):
+        if sel is None:
+            return np.bincount(c, weights=weights, minlength=n_groups)
+        return np.bincount(c[sel], weights=None if weights is None else weights[sel], minlength=n_groups)
+
+    err     = yt - yp
+    abs_err = np.abs(err)
+    n       = gsum().astype(np.float64)
+
+    nz      = yt != 0
+    denom   = (np.abs(yt) + np.abs(yp)) / 2
+    nd      = denom != 0
+    ape     = np.divide(abs_err, np.abs(yt), out=np.zeros_like(abs_err), where=nz)
+    sape    = np.divide(abs_err, denom, out=np.zeros_like(abs_err), where=nd)
+
+    # Naive lag-1 dentro de cada grupo, sobre filas contiguas ambas observadas
+    pair    = (codes[1:] == codes[:-1]) & obs[1:] & obs[:-1]
+    naive   = np.abs(np.diff(y_true))[pair]
+    c_naive = codes[1:][pair]
+    scale_s = np.bincount(c_naive, weights=naive, minlength=n_groups)
+    scale_n = np.bincount(c_naive, minlength=n_groups)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mae   = gsum(abs_err) / n
+        sse   = gsum(err ** 2)
+        mean  = gsum(yt) / n
+        sst   = gsum((yt - mean[c]) ** 2)
+        scale = scale_s / scale_n
+        out = {
+            "n":         n.astype(np.int64),
+            "MAE":       mae,
+            "RMSE":      np.sqrt(sse / n),
+            "MAPE (%)":  gsum(ape, nz) / gsum(sel=nz) * 100,
+            "sMAPE (%)": gsum(sape, nd) / gsum(sel=nd) * 100,
+            "MASE":      np.where(scale > 0, mae / scale, np.nan),
+            # Como sklearn: serie constante → 1 si el ajuste es perfecto, 0 si no
+            "R2":        np.where(sst > 0, 1 - sse / sst, np.where(sse == 0, 1.0, 0.0)),
+        }
+    out["R2"] = np.where(n >= 2, out["R2"], np.nan)
+    return pd.DataFrame(out)
+
+
+def score_matrix(y_true: np.ndarray, y_pred: np.ndarray) -> pd.DataFrame:
+    """
+    Métricas por fila de matrices (series × horizonte); una fila por serie.
+    Un vector 1-D se trata como una sola serie. y_true se difunde contra
+    y_pred, así que varias predicciones pueden compartir el mismo real.
+    """
+    y_true, y_pred = np.broadcast_arrays(np.atleast_2d(y_true), np.atleast_2d(y_pred))
+    n_series, horizon = y_true.shape
+    codes = np.repeat(np.arange(n_series), horizon)
+    return _score_codes(codes, y_true.ravel(), y_pred.ravel(), n_series)
+
+
+def score_frame(
+    df: pd.DataFrame,
+    by: Union[str, List[str]],
+    y_true: str = "y_true",
+    y_pred: str = "y_pred",
+    order: str = None,
+) -> pd.DataFrame:
+    """
+    Métricas por grupo de un frame en formato largo, con las claves `by`
+    como columnas. `order` (p. ej. "date" o "horizon") fija el orden
+    temporal dentro de cada grupo; sin él se usa el orden de las filas.
+    Las claves nulas forman su propio grupo (dropna=False).
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if order is not None:
+        df = df.sort_values(by + [order], kind="stable")
+    grouped = df.groupby(by, sort=True, dropna=False)
+    codes   = grouped.ngroup().to_numpy()
+    keys    = grouped.size().index.to_frame(index=False)
+    scores  = _score_codes(codes, df[y_true].to_numpy(), df[y_pred].to_numpy(), len(keys))
+    return pd.concat([keys, scores], axis=1)
+
+
+def _score_one(y_true: np.ndarray, y_pred: np.ndarray) -> pd.Series:
+    return score_matrix(np.ravel(y_true), np.ravel(y_pred)).iloc[0]
 
 def compute_mae(y_true: np.ndarray, y_pred: np.ndarray) -> float:
-    return float(np.mean(np.abs(y_true - y_pred)))
+    return float(_score_one(y_true, y_pred)["MAE"])
 
 def compute_rmse(y_true: np.ndarray, y_pred: np.ndarray) -> float:
-    return float(np.sqrt(np.mean((y_true - y_pred) ** 2)))
+    return float(_score_one(y_true, y_pred)["RMSE"])
 
 def compute_mape(y_true: np.ndarray, y_pred: np.ndarray) -> float:
     """
     Mean Absolute Percentage Error.
     Evita divisiones por cero: ignora donde y_true == 0.
     """
-    mask = y_true != 0
-    return float(np.mean(np.abs((y_true[mask] - y_pred[mask]) / y_true[mask])) * 100)
+    return float(_score_one(y_true, y_pred)["MAPE (%)"])
 
 def compute_smape(y_true: np.ndarray, y_pred: np.ndarray) -> float:
     """
     Symmetric MAPE.
     """
-    denom = (np.abs(y_true) + np.abs(y_pred)) / 2
-    mask = denom != 0
-    return float(np.mean(np.abs(y_true[mask] - y_pred[mask]) / denom[mask]) * 100)
+    return float(_score_one(y_true, y_pred)["sMAPE (%)"])
 
 def compute_mase(y_true: np.ndarray, y_pred: np.ndarray) -> float:
     """
     Mean Absolute Scaled Error.
     Scaling: MAE of naive forecast (lag-1).
     """
-    n = y_true.shape[0]
-    # denominador: MAE naive in-sample
-    naive_errors = np.abs(y_true[1:] - y_true[:-1])
-    scale = np.mean(naive_errors)
-    mae = np.mean(np.abs(y_true - y_pred))
-    return float(mae / scale) if scale != 0 else np.nan
+    return float(_score_one(y_true, y_pred)["MASE"])
 
 def compute_r2(y_true: np.ndarray, y_pred: np.ndarray) -> float:
-    return float(r2_score(y_true, y_pred))
+    return float(_score_one(y_true, y_pred)["R2"])
 
 def evaluate_forecast(
     actual: pd.Series,
@@ -51,18 +142,7 @@ def evaluate_forecast(
     """
     Retorna un diccionario con todas las métricas.
     """
-    # Alinear por fechas
-    fc = forecast.set_index(date_col)[yhat_col]
-    aligned = pd.concat([actual, fc], axis=1, join='inner')
-    aligned.columns = ["actual", "predicted"]
-    y_true = aligned["actual"].values
-    y_pred = aligned["predicted"].values
-
-    return {
-        "MAE": compute_mae(y_true, y_pred),
-        "RMSE": compute_rmse(y_true, y_pred),
-        "MAPE (%)": compute_mape(y_true, y_pred),
-        "sMAPE (%)": compute_smape(y_true, y_pred),
-        "MASE": compute_mase(y_true, y_pred),
-        "R2": compute_r2(y_true, y_pred)
-    }
+    # Alinear por fechas (las que falten quedan como NaN y se enmascaran)
+    fc = forecast.set_index(date_col)[yhat_col].reindex(actual.index)
+    scores = score_matrix(actual.to_numpy(), fc.to_numpy()).iloc[0]
+    return {name: float(scores[name]) for name in METRICS}
@@ -0,0 +1,65 @@
+# src/features/calendar.py
+
+import numpy as np
+import pandas as pd
+import holidays
+from functools import lru_cache
+
+
+@lru_cache(maxsize=32)
+def holiday_dates(start_year: int, end_year: int) -> np.ndarray:
+    """
+    Festivos de EE.UU. entre start_year y end_year (inclusive) como
+    array datetime64[ns] ordenado. Se construye una vez por rango de años.
+    """
+    us_holidays = holidays.US(years=range(start_year, end_year + 1))
+    dates = np.array(sorted(pd.to_datetime(list(us_holidays.keys()))), dtype="datetime64[ns]")
+    dates.setflags(write=False)
+    return dates
+
+
+def holiday_features(index: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    is_holiday (isin) y days_to_holiday (searchsorted) para todo el índice
+    de una vez. Como antes, los festivos son los de los años del índice y
+    days_to_holiday vale 0 si no queda ningún festivo por delante.
+    """
+    idx = pd.DatetimeIndex(index)
+    out = pd.DataFrame(index=idx, columns=["is_holiday", "days_to_holiday"], dtype=int)
+    if len(idx) == 0:
+        return out
+
+    hol    = holiday_dates(int(idx.year.min()), int(idx.year.max()))
+    values = idx.values.astype("datetime64[ns]")
+
+    out["is_holiday"] = idx.normalize().isin(hol).astype(int)
+
+    pos   = np.searchsorted(hol, values, side="left")
+    valid = pos < len(hol)
+    nxt   = hol[np.minimum(pos, len(hol) - 1)] if len(hol) else values
+    days  = (nxt - values) // np.timedelta64(1, "D")
+    out["days_to_holiday"] = np.where(valid, days, 0).astype(int)
+    return out
+
+
+def add_calendar_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Festivos, flags de calendario y codificación cíclica de mes / día de semana.
+    """
+    hol = holiday_features(df.index)
+    df["is_holiday"] = hol["is_holiday"].values
+
+    df["dow"]   = df.index.dayofweek
+    df["month"] = df.index.month
+    df["is_month_start"]   = df.index.is_month_start.astype(int)
+    df["is_month_end"]     = df.index.is_month_end.astype(int)
+    df["is_quarter_start"] = df.index.is_quarter_start.astype(int)
+    df["is_quarter_end"]   = df.index.is_quarter_end.astype(int)
+
+    df["days_to_holiday"] = hol["days_to_holiday"].values
+
+    df["month_sin"] = np.sin(2 * np.pi * df["month"] / 12)
+    df["month_cos"] = np.cos(2 * np.pi * df["month"] / 12)
+    df["dow_sin"]   = np.sin(2 * np.pi * df["dow"] / 7)
+    df["dow_cos"]   = np.cos(2 * np.pi * df["dow"] / 7)
+    return df
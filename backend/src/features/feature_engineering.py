@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 from typing import List, Optional
 
+from src.features.store import RollingFeature, mean_std_features, rolling_features
+
 def add_date_features(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     idx = pd.to_datetime(df.index)
@@ -42,23 +44,14 @@ def add_rolling_features(
     windows: List[int]
 ) -> pd.DataFrame:
     df = df.copy()
-    # rolling sobre sales
-    for w in windows:
-        df[f"roll_mean_{w}"] = df["sales"].shift(1).rolling(w).mean()
-        df[f"roll_std_{w}"]  = df["sales"].shift(1).rolling(w).std()
-    # tendencias locales: medianas móviles largas
-    df["trend_med_30"] = (
-        df["sales"]
-          .shift(1)
-          .rolling(window=30, min_periods=1, center=True)
-          .median()
-    )
-    df["trend_med_90"] = (
-        df["sales"]
-          .shift(1)
-          .rolling(window=90, min_periods=1, center=True)
-          .median()
-    )
+    # rolling sobre sales + tendencias locales (medianas móviles largas)
+    features = mean_std_features(windows, "roll_mean_{w}", "roll_std_{w}", shift=1) + [
+        RollingFeature("trend_med_30", "median", 30, min_periods=1, shift=1, center=True),
+        RollingFeature("trend_med_90", "median", 90, min_periods=1, shift=1, center=True),
+    ]
+    feats = rolling_features("sales", df["sales"], features)
+    for col in feats.columns:
+        df[col] = feats[col].values
     return df
 
 def encode_store_id(
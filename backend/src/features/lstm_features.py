@@ -0,0 +1,66 @@
+# src/features/lstm_features.py
+
+import os
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+from src.features.calendar import add_calendar_features
+from src.features.store import mean_std_features, rolling_features
+
+PROMO_PATH = "data/promotions.csv"
+
+# Columnas de entrada del LSTM (el orden es el del scaler guardado)
+LSTM_FEATURES = [
+    "sales_log", "promo_flag", "is_holiday",
+    "is_month_start", "is_month_end",
+    "is_quarter_start", "is_quarter_end",
+    "days_to_holiday",
+    "rm_7", "rstd_7",
+    "rm_14", "rstd_14",
+    "rm_30", "rstd_30",
+    "month_sin", "month_cos",
+    "dow_sin", "dow_cos"
+]
+# Ventanas de las estadísticas rodantes rm_{w} / rstd_{w}
+LSTM_WINDOWS = [7, 14, 30]
+
+
+def sales_clip_bounds(sales: pd.Series) -> Tuple[float, float]:
+    """Cuantiles 1% / 99% con los que se suaviza sales antes del log."""
+    lower, upper = sales.quantile([0.01, 0.99])
+    return lower, upper
+
+
+def enrich_features(df: pd.DataFrame, clip_bounds: Tuple[float, float] = None) -> pd.DataFrame:
+    """
+    Agrega variables exógenas, calendario avanzado,
+    codificación cíclica y estadísticas rodantes.
+    Compartido por train_lstm.py y evaluate_lstm.py.
+    clip_bounds fija los límites del suavizado (p.ej. calculados solo con
+    el tramo de entrenamiento); por defecto salen de toda la serie.
+    """
+    # promociones
+    if os.path.exists(PROMO_PATH):
+        promo = pd.read_csv(PROMO_PATH, parse_dates=["date"])
+        promo = promo.set_index("date").reindex(df.index, fill_value=0)
+        df["promo_flag"] = promo["promo_flag"]
+    else:
+        df["promo_flag"] = 0
+
+    # festivos USA, calendario y codificación cíclica (vectorizados)
+    df = add_calendar_features(df)
+
+    # suavizado y log-transform
+    lower, upper = clip_bounds if clip_bounds is not None else sales_clip_bounds(df["sales"])
+    df["sales_smooth"] = df["sales"].clip(lower, upper)
+    df["sales_log"]    = np.log1p(df["sales_smooth"])
+
+    # estadísticas rodantes de sales_log (feature store compartido)
+    features = mean_std_features(LSTM_WINDOWS, "rm_{w}", "rstd_{w}", min_periods=1)
+    rolling  = rolling_features("sales_log", df["sales_log"], features)
+    for w in LSTM_WINDOWS:
+        df[f"rm_{w}"]   = rolling[f"rm_{w}"]
+        df[f"rstd_{w}"] = rolling[f"rstd_{w}"].fillna(0)
+
+    return df
@@ -0,0 +1,97 @@
+# src/features/redundancy.py
+
+import numpy as np
+from typing import List, Tuple
+
+
+def correlation_matrix(
+    X: np.ndarray,
+    dtype=np.float32,
+    chunk_rows: int = 65536,
+) -> np.ndarray:
+    """
+    Correlación de Pearson de las columnas de X (n × p) por bloques de
+    chunk_rows filas: nunca se materializa la copia centrada completa.
+    Los productos van en dtype (float32 por defecto) y se acumulan en
+    float64. Las columnas constantes quedan con NaN, como en DataFrame.corr().
+    """
+    X = np.asarray(X)
+    n, p = X.shape
+
+    mean = np.zeros(p)
+    for a in range(0, n, chunk_rows):
+        mean += X[a:a + chunk_rows].sum(axis=0, dtype=np.float64)
+    mean /= n
+
+    gram = np.zeros((p, p))
+    mu   = mean.astype(dtype)
+    for a in range(0, n, chunk_rows):
+        Xc = X[a:a + chunk_rows].astype(dtype) - mu
+        gram += Xc.T @ Xc
+
+    sd = np.sqrt(np.diag(gram))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = gram / np.outer(sd, sd)
+    corr[sd == 0, :] = np.nan
+    corr[:, sd == 0] = np.nan
+    np.fill_diagonal(corr, np.where(sd == 0, np.nan, 1.0))
+    return corr.astype(dtype)
+
+
+def _inverse(C: np.ndarray, ridge: float) -> np.ndarray:
+    C = np.asarray(C, dtype=np.float64)
+    # ridge mínimo: columnas perfectamente colineales dan VIF enorme en vez de error
+    return np.linalg.inv(C + ridge * np.eye(C.shape[0]))
+
+
+def vif_from_corr(C: np.ndarray, ridge: float = 1e-10) -> np.ndarray:
+    """
+    Todos los VIF de una vez: diagonal de la inversa de la correlación
+    (VIF centrado, con intercepto). Columnas constantes → inf.
+    """
+    const = np.isnan(np.diag(C))
+    vif   = np.full(C.shape[0], np.inf)
+    if (~const).any():
+        vif[~const] = np.diag(_inverse(C[np.ix_(~const, ~const)], ridge))
+    return vif
+
+
+def prune_vif(
+    C: np.ndarray,
+    thresh: float = 5.0,
+    ridge: float = 1e-10,
+) -> Tuple[List[int], List[int], np.ndarray]:
+    """
+    Eliminación iterativa: quita la columna de mayor VIF mientras supere
+    thresh. La inversa se invierte una sola vez y tras cada baja se
+    actualiza con el complemento de Schur (rank-one, O(p²) por paso):
+        P' = P[-k,-k] - P[-k,k] P[k,-k] / P[k,k]
+    Devuelve (índices conservados, índices eliminados en orden, VIF finales).
+    """
+    const   = np.isnan(np.diag(C))
+    dropped = np.flatnonzero(const).tolist()
+    active  = np.flatnonzero(~const)
+    if len(active) == 0:
+        return [], dropped, np.empty(0)
+
+    P = _inverse(C[np.ix_(active, active)], ridge)
+    while len(active) > 1:
+        vif = np.diag(P)
+        k   = int(np.argmax(vif))
+        if vif[k] <= thresh:
+            break
+        dropped.append(int(active[k]))
+        keep   = np.arange(len(active)) != k
+        col    = P[keep, k]
+        P      = P[np.ix_(keep, keep)] - np.outer(col, col) / P[k, k]
+        active = active[keep]
+    return active.tolist(), dropped, np.diag(P).copy()
+
+
+def correlated_pairs(C: np.ndarray, thresh: float = 0.9) -> List[int]:
+    """
+    Columnas con |corr| > thresh respecto de alguna anterior (triángulo
+    superior, misma regla que el filtro de correlación con pandas).
+    """
+    upper = np.triu(np.abs(np.nan_to_num(C)), k=1)
+    return np.flatnonzero((upper > thresh).any(axis=0)).tolist()
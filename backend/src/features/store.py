@@ -0,0 +1,301 @@
+# src/features/store.py
+
+import math
+import bisect
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Súbelo si cambia la semántica de algún cálculo
+STORE_VERSION = 1
+NAN = float("nan")
+
+
+@dataclass(frozen=True)
+class RollingFeature:
+    """
+    Definición con nombre de una estadística rodante sobre una serie.
+    Semántica de pandas: series.shift(shift).rolling(window, min_periods,
+    center).<stat>() o, para stat="ewm", .ewm(alpha, adjust=False).mean().
+    """
+    name:        str
+    stat:        str                      # "mean" | "std" | "median" | "ewm"
+    window:      int = 1
+    min_periods: Optional[int] = None     # None → window (como pandas)
+    shift:       int = 0
+    center:      bool = False             # centradas: se recalculan completas
+    alpha:       Optional[float] = None   # solo ewm
+
+    @property
+    def required_periods(self) -> int:
+        return self.window if self.min_periods is None else self.min_periods
+
+
+# — Estado O(1) / O(window) por feature para actualizar día a día —
+
+class _WindowMoments:
+    """Media / desviación (ddof=1) en ventana deslizante, Welford con altas y bajas."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buf    = deque()
+        self.n      = 0
+        self.mean   = 0.0
+        self.m2     = 0.0
+
+    def push(self, x: float) -> None:
+        self.buf.append(x)
+        if not math.isnan(x):
+            self.n += 1
+            d = x - self.mean
+            self.mean += d / self.n
+            self.m2   += d * (x - self.mean)
+        if len(self.buf) > self.window:
+            self._remove(self.buf.popleft())
+
+    def _remove(self, x: float) -> None:
+        if math.isnan(x):
+            return
+        if self.n == 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.n -= 1
+        d = x - self.mean
+        self.mean -= d / self.n
+        self.m2    = max(0.0, self.m2 - d * (x - self.mean))
+
+    def value(self, stat: str, min_periods: int) -> float:
+        if self.n == 0 or self.n < min_periods:
+            return NAN
+        if stat == "mean":
+            return self.mean
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else NAN
+
+
+class _WindowMedian:
+    """Mediana en ventana deslizante: deque de llegada + lista ordenada (bisect)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buf    = deque()
+        self.sorted = []
+
+    def push(self, x: float) -> None:
+        self.buf.append(x)
+        if not math.isnan(x):
+            bisect.insort(self.sorted, x)
+        if len(self.buf) > self.window:
+            old = self.buf.popleft()
+            if not math.isnan(old):
+                del self.sorted[bisect.bisect_left(self.sorted, old)]
+
+    def value(self, stat: str, min_periods: int) -> float:
+        n = len(self.sorted)
+        if n == 0 or n < min_periods:
+            return NAN
+        mid = n // 2
+        if n % 2:
+            return self.sorted[mid]
+        return (self.sorted[mid - 1] + self.sorted[mid]) / 2
+
+
+class _Ewm:
+    """EWM con adjust=False: y_t = (1 - alpha) * y_{t-1} + alpha * x_t (NaN se saltan)."""
+
+    def __init__(self, alpha: float, last: float = NAN):
+        self.alpha = alpha
+        self.last  = last
+
+    def push(self, x: float) -> None:
+        if math.isnan(x):
+            return
+        self.last = x if math.isnan(self.last) else (1 - self.alpha) * self.last + self.alpha * x
+
+    def value(self, stat: str, min_periods: int) -> float:
+        return self.last
+
+
+class _FeatureState:
+    """Estado de una feature: línea de retardo (shift) + estadístico."""
+
+    def __init__(self, feature: RollingFeature, core):
+        self.feature = feature
+        self.core    = core
+        self.pending = deque()
+
+    def step(self, x: float) -> float:
+        self.pending.append(x)
+        if len(self.pending) > self.feature.shift:
+            self.core.push(self.pending.popleft())
+        return self.core.value(self.feature.stat, self.feature.required_periods)
+
+
+def _new_core(f: RollingFeature):
+    if f.stat in ("mean", "std"):
+        return _WindowMoments(f.window)
+    if f.stat == "median":
+        return _WindowMedian(f.window)
+    if f.stat == "ewm":
+        return _Ewm(f.alpha)
+    raise ValueError(f"Estadístico no soportado: {f.stat!r}")
+
+
+# — Cómputo completo (vectorizado) —
+
+def _compute_full(series: pd.Series, f: RollingFeature) -> pd.Series:
+    s = series.shift(f.shift) if f.shift else series
+    if f.stat == "ewm":
+        return s.ewm(alpha=f.alpha, adjust=False, ignore_na=True).mean()
+    r = s.rolling(f.window, min_periods=f.min_periods, center=f.center)
+    return getattr(r, f.stat)()
+
+
+def _seed_state(series: pd.Series, f: RollingFeature, full: pd.Series) -> _FeatureState:
+    """
+    Estado equivalente a haber recorrido toda la serie, a partir de su cola.
+    """
+    values = series.to_numpy(dtype=float)
+    n      = len(values)
+    cut    = max(0, n - f.shift)
+    state  = _FeatureState(f, _new_core(f))
+    state.pending.extend(values[cut:])
+    if f.stat == "ewm":
+        # full[t] es el ewm hasta t - shift: su último valor es el ya consumido
+        state.core.last = float(full.iloc[-1]) if cut else NAN
+    else:
+        for x in values[max(0, cut - f.window):cut]:
+            state.core.push(float(x))
+    return state
+
+
+def series_fingerprint(series: pd.Series) -> str:
+    hashed = pd.util.hash_pandas_object(series, index=True).to_numpy()
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+
+def features_version(features: Sequence[RollingFeature]) -> str:
+    payload = repr((STORE_VERSION, tuple(features))).encode()
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+class _Entry:
+    def __init__(self, series, frame, states, fingerprint):
+        self.series      = series
+        self.frame       = frame
+        self.states      = states
+        self.fingerprint = fingerprint
+
+
+class FeatureStore:
+    """
+    Caché de features rodantes por (serie, versión de definiciones).
+    - Misma serie (por contenido): se devuelve el frame ya calculado.
+    - La serie cacheada es prefijo de la nueva (llegan días nuevos): solo se
+      calculan las filas nuevas con el estado incremental de cada feature.
+    - Cualquier otro caso: cálculo completo vectorizado con pandas.
+    Las features centradas dependen de valores futuros y se recalculan completas.
+    Es thread-safe: la API las pide desde el pool de inferencia.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple[str, str], _Entry]" = OrderedDict()
+        self._lock       = threading.Lock()
+
+    def compute(
+        self,
+        series_id: str,
+        series: pd.Series,
+        features: Sequence[RollingFeature],
+    ) -> pd.DataFrame:
+        features = tuple(features)
+        key      = (series_id, features_version(features))
+        series   = series.astype(float)
+        fp       = series_fingerprint(series)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.fingerprint == fp:
+                self._entries.move_to_end(key)
+                return entry.frame.copy()
+
+            if entry is not None and self._is_prefix(entry.series, series):
+                entry = self._append(entry, series, features, fp)
+            else:
+                entry = self._build(series, features, fp)
+
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry.frame.copy()
+
+    @staticmethod
+    def _is_prefix(old: pd.Series, new: pd.Series) -> bool:
+        n = len(old)
+        if n == 0 or len(new) <= n:
+            return False
+        return (
+            new.index[:n].equals(old.index)
+            and np.array_equal(new.to_numpy()[:n], old.to_numpy(), equal_nan=True)
+        )
+
+    def _build(self, series, features, fp) -> _Entry:
+        cols, states = {}, {}
+        for f in features:
+            cols[f.name] = _compute_full(series, f)
+            if not f.center:
+                states[f.name] = _seed_state(series, f, cols[f.name])
+        frame = pd.DataFrame(cols, index=series.index)
+        return _Entry(series, frame, states, fp)
+
+    def _append(self, entry: _Entry, series, features, fp) -> _Entry:
+        new_vals = series.to_numpy(dtype=float)[len(entry.series):]
+        new_idx  = series.index[len(entry.series):]
+        rows     = {f.name: np.empty(len(new_vals)) for f in features if not f.center}
+        for i, x in enumerate(new_vals):
+            for name, state in entry.states.items():
+                rows[name][i] = state.step(float(x))
+        tail  = pd.DataFrame(rows, index=new_idx)
+        frame = pd.concat([entry.frame.drop(columns=[f.name for f in features if f.center]), tail])
+        for f in features:
+            if f.center:
+                frame[f.name] = _compute_full(series, f)
+        frame = frame[[f.name for f in features]]
+        return _Entry(series, frame, entry.states, fp)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Instancia compartida por todos los consumidores del proceso
+FEATURE_STORE = FeatureStore()
+
+
+def rolling_features(
+    series_id: str,
+    series: pd.Series,
+    features: Sequence[RollingFeature],
+) -> pd.DataFrame:
+    return FEATURE_STORE.compute(series_id, series, features)
+
+
+def mean_std_features(
+    windows: Sequence[int],
+    mean_fmt: str,
+    std_fmt: str,
+    shift: int = 0,
+    min_periods: Optional[int] = None,
+) -> List[RollingFeature]:
+    """[mean_w, std_w] por ventana, en el orden habitual de los consumidores."""
+    out = []
+    for w in windows:
+        out.append(RollingFeature(mean_fmt.format(w=w), "mean", w, min_periods, shift))
+        out.append(RollingFeature(std_fmt.format(w=w),  "std",  w, min_periods, shift))
+    return out
@@ -1,19 +1,69 @@
+import numpy as np
 import torch
 import torch.nn as nn
 
 class LSTMModel(nn.Module):
-    def __init__(self, input_size, hidden_size=128, num_layers=2, dropout=0.2):
+    def __init__(self, input_size, hidden_size=128, num_layers=2, dropout=0.2, horizon=1, quantiles=None):
         super(LSTMModel, self).__init__()
+        self.horizon = horizon
         self.lstm = nn.LSTM(
             input_size, hidden_size,
             num_layers=num_layers,
             batch_first=True,
             dropout=dropout
         )
-        self.fc = nn.Linear(hidden_size, 1)
+        # Cabeza directa: los `horizon` pasos futuros en un solo forward,
+        # y con cuantiles, Q valores por paso (sin cuantiles: solo el punto)
+        self.n_quantiles = 0
+        if quantiles:
+            quantiles = sorted(float(q) for q in quantiles)
+            if quantiles[len(quantiles) // 2] != 0.5:
+                raise ValueError(f"Los cuantiles deben tener la mediana en el centro: {quantiles}")
+            self.n_quantiles = len(quantiles)
+            # buffer: viaja en el state_dict y se recupera al cargarlo
+            self.register_buffer("quantiles", torch.tensor(quantiles))
+        self.fc = nn.Linear(hidden_size, horizon * max(self.n_quantiles, 1))
 
     def forward(self, x):
-        # x: [batch, seq_len, features]
+        # x: [batch, seq_len, features] → [batch, horizon] ó [batch, horizon, Q]
         out, _ = self.lstm(x)
         out = out[:, -1, :]         # último time‐step
-        return self.fc(out)
+        out = self.fc(out)
+        if self.n_quantiles:
+            out = out.view(out.shape[0], self.horizon, self.n_quantiles)
+        return out
+
+
+def quantile_bands(out):
+    """
+    (punto, inferior, superior) de una salida del LSTM como arrays numpy.
+    Con cuantiles, el último eje [Q] se ordena (evita cruces) y el punto es
+    la mediana; sin cuantiles las bandas son None.
+    """
+    out = out.detach().cpu().numpy() if torch.is_tensor(out) else np.asarray(out)
+    if out.ndim < 3:
+        return out, None, None
+    out = np.sort(out, axis=-1)
+    return out[..., out.shape[-1] // 2], out[..., 0], out[..., -1]
+
+
+def lstm_hparams_from_state(state_dict) -> dict:
+    """
+    Deduce input_size / hidden_size / num_layers / horizon / quantiles de un
+    state_dict guardado, para no tener que replicar los hiperparámetros a mano al cargarlo.
+    """
+    w_ih = state_dict["lstm.weight_ih_l0"]
+    w_hh = state_dict["lstm.weight_hh_l0"]
+    num_layers = sum(
+        1 for k in state_dict
+        if k.startswith("lstm.weight_ih_l") and not k.endswith("_reverse")
+    )
+    quantiles = state_dict.get("quantiles")
+    n_out     = state_dict["fc.weight"].shape[0]
+    return {
+        "input_size":  w_ih.shape[1],
+        "hidden_size": w_hh.shape[1],
+        "num_layers":  num_layers,
+        "horizon":     n_out // (1 if quantiles is None else len(quantiles)),
+        "quantiles":   None if quantiles is None else [round(q, 6) for q in quantiles.tolist()],
+    }
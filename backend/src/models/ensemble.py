@@ -1,19 +1,29 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from typing import List, Tuple
 from joblib import dump, load
 from xgboost import XGBRegressor
 
-from src.models.prophet_model import load_model, _add_date_regressors
-from src.config import FREQ, HORIZON_DAYS
+from src.models.forecast_cache import prophet_forecast
+from src.features.store import mean_std_features, rolling_features
+from src.data.cache import file_fingerprint, make_key, read_array, write_array
+from src.config import FREQ, HORIZON_DAYS, XGB_FEATURE_CACHE, XGB_N_JOBS
 
 MODEL_DIR     = Path("models")
 ENSEMBLE_PATH = MODEL_DIR / "xgb_residual_adv_fixed.joblib"
+PROPHET_PATH  = MODEL_DIR / "prophet_model.joblib"
 
 # Ahora incluimos 30 en las ventanas rolling
 # 1) Extiende tus ventanas rolling para incluir 365 días
 WINDOWS = [7, 14, 28, 30, 60, 90, 180, 365]
 
+# Súbelo si cambian las columnas de _make_features (invalida la caché)
+FEATURES_VERSION = 1
+
+# Matrices ya construidas en este proceso: clave → (fechas, columnas, valores)
+_MATRICES = {}
+
 
 def _make_features(df_fc: pd.DataFrame, resid: pd.Series = None) -> pd.DataFrame:
     df = pd.DataFrame(index=df_fc.index)
@@ -30,9 +40,10 @@ def _make_features(df_fc: pd.DataFrame, resid: pd.Series = None) -> pd.DataFrame
     df["lag_7"] = df["yhat"].shift(7)
 
     # Rolling statistics sobre yhat, ahora con ventana 365 incluida
-    for w in WINDOWS:
-        df[f"roll_mean_{w}"] = df["yhat"].shift(1).rolling(w, min_periods=1).mean()
-        df[f"roll_std_{w}"]  = df["yhat"].shift(1).rolling(w, min_periods=1).std()
+    features = mean_std_features(WINDOWS, "roll_mean_{w}", "roll_std_{w}", shift=1, min_periods=1)
+    rolling  = rolling_features("prophet_yhat", df["yhat"], features)
+    for col in rolling.columns:
+        df[col] = rolling[col]
 
     # Volatilidad explícita de 365 días
     df["volatility_365"] = df["roll_std_365"]
@@ -51,26 +62,81 @@ def _make_features(df_fc: pd.DataFrame, resid: pd.Series = None) -> pd.DataFrame
     return df.bfill().ffill()
 
 
-def train_ensemble(df_ts: pd.DataFrame) -> None:
-    MODEL_DIR.mkdir(exist_ok=True)
+def _feature_matrix(df_fc: pd.DataFrame) -> Tuple[pd.DatetimeIndex, List[str], np.ndarray]:
+    """
+    _make_features como matriz float32: "yhat" en la columna 0 y las
+    features del XGB en el resto.
+    """
+    feats = _make_features(df_fc)
+    cols  = ["yhat"] + [c for c in feats.columns if c != "yhat"]
+    return feats.index, cols, feats[cols].to_numpy(dtype=np.float32)
+
+
+def residual_features(
+    model_path: Path = PROPHET_PATH,
+    periods: int = None,
+    freq: str = None,
+    persist: bool = None,
+) -> Tuple[pd.DatetimeIndex, List[str], np.ndarray]:
+    """
+    Matriz de features del XGB de residuos sobre el forecast de Prophet de
+    model_path. Se construye una vez por (hash del modelo, periods, freq) y
+    con persist (XGB_FEATURE_CACHE) se guarda en CACHE_DIR como .npy que
+    se relee con memory-map. Devuelve (fechas, columnas, valores).
+    """
+    periods = HORIZON_DAYS if periods is None else periods
+    freq    = freq or FREQ
+    persist = XGB_FEATURE_CACHE if persist is None else persist
 
-    # 1) Forecast completo de Prophet
-    model  = load_model()
-    future = model.make_future_dataframe(periods=HORIZON_DAYS, freq=FREQ)
-    future = _add_date_regressors(future)
-    fc_all = model.predict(future).set_index("ds")
+    key = make_key(version=FEATURES_VERSION, model=file_fingerprint(model_path), periods=periods, freq=freq)
+    if key in _MATRICES:
+        return _MATRICES[key]
 
-    # 2) Generar y alinear features con df_ts
-    feats     = _make_features(fc_all)
-    feats_hist = feats.loc[df_ts.index]
+    name   = f"xgb_features_{key}.npy"
+    cached = read_array(name) if persist else None
+    if cached is not None:
+        values, meta = cached
+        result = (pd.DatetimeIndex(meta["index"], name="ds"), meta["columns"], values)
+    else:
+        fc_all = prophet_forecast(periods=periods, freq=freq, model_path=model_path, mode="components").set_index("ds")
+        result = _feature_matrix(fc_all)
+        if persist:
+            index, cols, values = result
+            write_array(values, name, {"columns": cols, "index": [d.isoformat() for d in index]})
 
-    # 3) Calcular residuo histórico
-    resid    = df_ts["sales"] - feats_hist["yhat"]
+    _MATRICES[key] = result
+    return result
+
+
+def _rows(index: pd.DatetimeIndex, dates: pd.Index) -> np.ndarray:
+    rows = index.get_indexer(dates)
+    if (rows < 0).any():
+        raise KeyError(f"{int((rows < 0).sum())} fechas sin features de Prophet")
+    return rows
 
-    # 4) Entrenar XGB simple sobre residuos
-    X_train = feats_hist.drop(columns=["yhat"])
-    y_train = resid.values
 
+def _frame(values: np.ndarray, cols: List[str]) -> pd.DataFrame:
+    """Vista con nombres de columna: el XGB valida feature_names al predecir."""
+    return pd.DataFrame(values, columns=cols, copy=False)
+
+
+def load_residual_model(ensemble_path: Path, cols: List[str]) -> XGBRegressor:
+    """
+    Carga el XGB de residuos comprobando que se entrenó con las columnas
+    actuales de la matriz (sin "yhat"); si no, hay que reentrenarlo.
+    """
+    xgb      = load(ensemble_path)
+    expected = getattr(xgb, "feature_names_in_", None)
+    if expected is None or list(expected) != list(cols):
+        raise ValueError(
+            f"{ensemble_path} no coincide con las features actuales "
+            f"({len(cols)} columnas, FEATURES_VERSION={FEATURES_VERSION}); reentrena con train.py"
+        )
+    return xgb
+
+
+def _fit_residual_model(X_train: pd.DataFrame, y_train: np.ndarray, n_jobs: int = None) -> XGBRegressor:
+    # Con tree_method="hist" el wrapper construye un QuantileDMatrix a partir del frame
     xgb = XGBRegressor(
         objective="reg:squarederror",
         n_estimators=300,
@@ -80,33 +146,55 @@ def train_ensemble(df_ts: pd.DataFrame) -> None:
         colsample_bytree=0.9,
         random_state=42,
         tree_method="hist",
+        n_jobs=n_jobs or XGB_N_JOBS or None,
     )
     xgb.fit(X_train, y_train)
+    return xgb
+
+
+def train_ensemble(
+    df_ts: pd.DataFrame,
+    model_path: Path = PROPHET_PATH,
+    ensemble_path: Path = ENSEMBLE_PATH,
+) -> None:
+    Path(ensemble_path).parent.mkdir(parents=True, exist_ok=True)
+
+    # 1) Matriz de features del forecast de Prophet (cacheada por artefacto)
+    index, cols, values = residual_features(model_path, HORIZON_DAYS, FREQ)
+
+    # 2) Filas alineadas con df_ts
+    hist = values[_rows(index, df_ts.index)]
+
+    # 3) Calcular residuo histórico
+    resid = df_ts["sales"].to_numpy() - hist[:, 0]
+
+    # 4) Entrenar XGB simple sobre residuos
+    xgb = _fit_residual_model(_frame(hist[:, 1:], cols[1:]), resid)
 
     # 5) Guardar modelo
-    dump(xgb, ENSEMBLE_PATH)
+    dump(xgb, ensemble_path)
 
 
-def predict_ensemble(df_ts: pd.DataFrame) -> pd.DataFrame:
-    # 1) Carga XGB y Prophet
-    xgb   = load(ENSEMBLE_PATH)
-    model = load_model()
+def predict_ensemble(
+    df_ts: pd.DataFrame,
+    model_path: Path = PROPHET_PATH,
+    ensemble_path: Path = ENSEMBLE_PATH,
+) -> pd.DataFrame:
+    # 1) Forecast completo y su matriz de features (reutiliza las de train_ensemble)
+    fc_all = prophet_forecast(periods=HORIZON_DAYS, freq=FREQ, model_path=model_path, mode="full").set_index("ds")
+    index, cols, values = residual_features(model_path, HORIZON_DAYS, FREQ)
 
-    # 2) Forecast completo
-    future = model.make_future_dataframe(periods=HORIZON_DAYS, freq=FREQ)
-    future = _add_date_regressors(future)
-    fc_all = model.predict(future).set_index("ds")
+    # 2) Carga XGB (validando sus columnas)
+    xgb = load_residual_model(ensemble_path, cols[1:])
 
-    # 3) Features y horizonte de test
-    feats     = _make_features(fc_all)
-    feats_fut = feats.loc[df_ts.index[-HORIZON_DAYS:]]
+    # 3) Horizonte de test
+    feats_fut = values[_rows(index, df_ts.index[-HORIZON_DAYS:])]
 
     # 4) Predicción de residuo
-    X_test     = feats_fut.drop(columns=["yhat"])
-    resid_pred = xgb.predict(X_test)
+    resid_pred = xgb.predict(_frame(feats_fut[:, 1:], cols[1:]))
 
     # 5) Ensamble final
-    yhat_base  = feats_fut["yhat"].values
+    yhat_base  = fc_all["yhat"].reindex(df_ts.index[-HORIZON_DAYS:]).to_numpy()
     yhat_final = yhat_base + resid_pred
 
     out = fc_all.iloc[-HORIZON_DAYS:][["yhat_lower","yhat_upper"]].copy()
@@ -114,9 +202,13 @@ def predict_ensemble(df_ts: pd.DataFrame) -> pd.DataFrame:
     return out.reset_index().rename(columns={"ds":"date"})
 
 
-def fit_and_forecast(df_ts: pd.DataFrame) -> pd.DataFrame:
+def fit_and_forecast(
+    df_ts: pd.DataFrame,
+    model_path: Path = PROPHET_PATH,
+    ensemble_path: Path = ENSEMBLE_PATH,
+) -> pd.DataFrame:
     """
     Wrapper para train.py: entrena el ensemble y devuelve el forecast.
     """
-    train_ensemble(df_ts)
-    return predict_ensemble(df_ts)
+    train_ensemble(df_ts, model_path, ensemble_path)
+    return predict_ensemble(df_ts, model_path, ensemble_path)
@@ -0,0 +1,82 @@
+# src/models/forecast_cache.py
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from pathlib import Path
+from prophet import Prophet
+
+from src.config import FORECAST_CACHE_PERSIST, FORECAST_MEMORY_SIZE, FREQ, HORIZON_DAYS
+from src.data.cache import file_fingerprint, make_key, read_frame, write_frame
+from src.models.prophet_model import MODEL_DIR, PREDICT_MODES, _add_date_regressors, load_model, predict_with_mode
+
+# Forecasts ya calculados en este proceso: clave → DataFrame (LRU acotado)
+_MEMORY      = OrderedDict()
+_MEMORY_LOCK = threading.Lock()
+
+
+def _memory_get(key: str):
+    with _MEMORY_LOCK:
+        fc = _MEMORY.get(key)
+        if fc is not None:
+            _MEMORY.move_to_end(key)
+        return fc
+
+
+def _memory_put(key: str, fc: pd.DataFrame) -> None:
+    with _MEMORY_LOCK:
+        _MEMORY[key] = fc
+        _MEMORY.move_to_end(key)
+        while len(_MEMORY) > max(0, FORECAST_MEMORY_SIZE):
+            _MEMORY.popitem(last=False)
+
+
+def prophet_forecast(
+    model: Prophet = None,
+    periods: int = None,
+    freq: str = None,
+    model_path: Path = MODEL_DIR / "prophet_model.joblib",
+    persist: bool = None,
+    mode: str = "full",
+) -> pd.DataFrame:
+    """
+    model.predict(make_future_dataframe(periods, freq)) memoizado por
+    (hash del artefacto en model_path, periods, freq, mode) en un LRU de
+    FORECAST_MEMORY_SIZE entradas. Si se pasa model
+    debe ser el que está guardado en model_path; solo evita recargarlo.
+    mode es el de predict_with_mode; si ya hay en caché un modo más caro
+    (que incluye las columnas pedidas) se reutiliza ese.
+    """
+    periods = HORIZON_DAYS if periods is None else periods
+    freq    = freq or FREQ
+    persist = FORECAST_CACHE_PERSIST if persist is None else persist
+
+    fingerprint = file_fingerprint(model_path)
+    keys = {
+        m: make_key(model=fingerprint, periods=periods, freq=freq, mode=m)
+        for m in PREDICT_MODES[PREDICT_MODES.index(mode):]
+    }
+    for key in keys.values():
+        fc = _memory_get(key)
+        if fc is not None:
+            return fc.copy()
+
+    key  = keys[mode]
+    name = f"prophet_fc_{key}.feather"
+    fc   = read_frame(name) if persist else None
+    if fc is None:
+        model  = model or load_model(model_path)
+        future = model.make_future_dataframe(periods=periods, freq=freq)
+        future = _add_date_regressors(future)
+        fc     = predict_with_mode(model, future, mode)
+        if persist:
+            write_frame(fc, name)
+
+    _memory_put(key, fc)
+    return fc.copy()
+
+
+def clear_forecast_cache() -> None:
+    with _MEMORY_LOCK:
+        _MEMORY.clear()
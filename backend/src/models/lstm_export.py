@@ -0,0 +1,128 @@
+# src/models/lstm_export.py
+
+import json
+import time
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from src.config import LSTM_THREADS
+from src.data.cache import file_fingerprint
+from src.models.LSTM_model import LSTMModel, lstm_hparams_from_state
+
+try:
+    import onnxruntime as ort
+except ImportError:  # sin onnxruntime solo se sirve TorchScript / eager
+    ort = None
+
+MODEL_DIR   = Path("models")
+STATE_PATH  = MODEL_DIR / "lstm_quantile.pth"
+SCRIPT_PATH = MODEL_DIR / "lstm_quantile.ts"
+ONNX_PATH   = MODEL_DIR / "lstm_quantile.onnx"
+META_PATH   = MODEL_DIR / "lstm_export.json"
+
+
+def set_lstm_threads(n_threads: int = None) -> None:
+    """Hilos intra-op de torch para la inferencia del LSTM (0 = por defecto)."""
+    n_threads = LSTM_THREADS if n_threads is None else n_threads
+    if n_threads > 0:
+        torch.set_num_threads(n_threads)
+
+
+def load_eager(state_path: Path) -> LSTMModel:
+    """state_dict → LSTMModel en eval (hiperparámetros deducidos del propio state)."""
+    set_lstm_threads()
+    state = torch.load(state_path, map_location="cpu")
+    model = LSTMModel(**lstm_hparams_from_state(state), dropout=0.0)
+    model.load_state_dict(state)
+    return model.eval()
+
+
+def export_lstm(
+    state_path: Union[str, Path] = STATE_PATH,
+    out_dir: Union[str, Path] = MODEL_DIR,
+    seq_len: int = 60,
+    quantize: bool = False,
+    onnx: bool = False,
+) -> dict:
+    """
+    Exporta el state_dict del LSTM a TorchScript (trace + freeze) con los
+    tamaños ya fijados y, opcionalmente, a ONNX (batch y seq_len dinámicos).
+    quantize aplica cuantización dinámica int8 a las capas LSTM / Linear
+    (solo TorchScript). Escribe lstm_export.json con la metadata.
+    """
+    state_path = Path(state_path)
+    out_dir    = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    model   = load_eager(state_path)
+    hparams = lstm_hparams_from_state(model.state_dict())
+    example = torch.zeros(1, seq_len, hparams["input_size"])
+
+    scripted = model
+    if quantize:
+        scripted = torch.ao.quantization.quantize_dynamic(
+            model, {nn.LSTM, nn.Linear}, dtype=torch.qint8
+        )
+    with torch.no_grad():
+        traced = torch.jit.freeze(torch.jit.trace(scripted, example).eval())
+    traced.save(str(out_dir / SCRIPT_PATH.name))
+
+    files = {"torchscript": SCRIPT_PATH.name}
+    if onnx:
+        torch.onnx.export(
+            model, example, str(out_dir / ONNX_PATH.name),
+            input_names=["x"], output_names=["y"],
+            dynamic_axes={"x": {0: "batch", 1: "seq_len"}, "y": {0: "batch"}},
+            dynamo=False,
+        )
+        files["onnx"] = ONNX_PATH.name
+
+    meta = {
+        **hparams,
+        "seq_len":     seq_len,
+        "quantized":   quantize,
+        "source":      state_path.name,
+        "source_hash": file_fingerprint(state_path),
+        "torch":       torch.__version__,
+        "files":       files,
+        "exported_at": time.time(),
+    }
+    (out_dir / META_PATH.name).write_text(json.dumps(meta, indent=2))
+    return meta
+
+
+def load_torchscript(path: Path) -> torch.jit.ScriptModule:
+    set_lstm_threads()
+    model = torch.jit.load(str(path), map_location="cpu")
+    return model.eval()
+
+
+class OnnxLSTM(nn.Module):
+    """
+    Envoltorio de una sesión de onnxruntime con la misma interfaz que el
+    LSTM de torch: forward(tensor [batch, seq_len, features]) → tensor.
+    """
+
+    def __init__(self, path: Path, n_threads: int = None):
+        super().__init__()
+        if ort is None:
+            raise ImportError("LSTM_RUNTIME=onnx requiere onnxruntime")
+        n_threads = LSTM_THREADS if n_threads is None else n_threads
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if n_threads > 0:
+            opts.intra_op_num_threads = n_threads
+        self.session = ort.InferenceSession(str(path), opts, providers=["CPUExecutionProvider"])
+        self.input   = self.session.get_inputs()[0].name
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        arr = np.ascontiguousarray(x.detach().cpu().numpy(), dtype=np.float32)
+        return torch.from_numpy(self.session.run(None, {self.input: arr})[0])
+
+
+def load_onnx(path: Path) -> OnnxLSTM:
+    return OnnxLSTM(path)
@@ -0,0 +1,166 @@
+# src/models/lstm_training.py
+
+import json
+import time
+import numpy as np
+import torch
+from pathlib import Path
+from typing import Sequence
+from torch import optim
+from torch.utils.data import DataLoader, Dataset
+
+from src.config import (
+    LSTM_BATCH_SIZE, LSTM_BF16, LSTM_COMPILE, LSTM_LOADER_WORKERS, LSTM_QUANTILES,
+    LSTM_TRAIN_THREADS,
+)
+from src.models.LSTM_model import LSTMModel
+
+# Metadatos del LSTM entrenado (ventana, horizonte, features) para evaluar / servir
+CONFIG_PATH = Path("models") / "lstm_config.json"
+
+
+def quantile_loss(pred, target, q=0.5):
+    """
+    Pérdida pinball. Con q tensor [Q] pred lleva un último eje Q y la
+    pérdida es la media conjunta de todos los cuantiles.
+    """
+    if torch.is_tensor(q) and q.ndim > 0:
+        target = target.unsqueeze(-1)
+    err = target - pred
+    return torch.max(q * err, (q - 1) * err).mean()
+
+
+def save_lstm_config(path: Path = CONFIG_PATH, **config) -> None:
+    Path(path).write_text(json.dumps(config, indent=2))
+
+
+def load_lstm_config(path: Path = CONFIG_PATH) -> dict:
+    """Config guardada por train_lstm.py; los modelos previos son de un paso."""
+    config = {"seq_len": 60, "horizon": 1}
+    if Path(path).exists():
+        config.update(json.loads(Path(path).read_text()))
+    return config
+
+
+def unscale_target(scaler, values: np.ndarray, target_idx: int) -> np.ndarray:
+    """Deshace el MinMaxScaler solo en la columna objetivo."""
+    return np.asarray(values) * scaler.data_range_[target_idx] + scaler.data_min_[target_idx]
+
+
+def _loader(ds: Dataset, batch_size: int, shuffle: bool, num_workers: int, pin: bool) -> DataLoader:
+    return DataLoader(
+        ds, batch_size=batch_size, shuffle=shuffle,
+        num_workers=num_workers, persistent_workers=num_workers > 0,
+        pin_memory=pin,
+    )
+
+
+def fit_lstm(
+    train_ds: Dataset,
+    val_ds: Dataset,
+    input_size: int,
+    hidden_size: int = 128,
+    num_layers: int = 2,
+    dropout: float = 0.2,
+    horizon: int = 1,
+    quantiles: Sequence[float] = None,
+    epochs: int = 100,
+    patience: int = 10,
+    batch_size: int = None,
+    checkpoint_path: str = None,
+    verbose: bool = True,
+    num_threads: int = None,
+    num_workers: int = None,
+    bf16: bool = None,
+    use_compile: bool = None,
+):
+    """
+    Bucle de entrenamiento del LSTM (Adam + ReduceLROnPlateau, early stopping).
+    Con horizon > 1 la cabeza predice todos los pasos de una vez (objetivos
+    [batch, horizon] de SequenceDataset) y, por paso, los cuantiles de
+    LSTM_QUANTILES con una pérdida pinball conjunta; quantiles=[] o False
+    entrena un modelo puntual (solo la mediana, q=0.5).
+    Devuelve (modelo con los mejores pesos, mejor val_loss).
+    Los parámetros en None toman su valor de config (LSTM_*). La pérdida se
+    acumula en el dispositivo y se sincroniza una vez por época; el mejor
+    state_dict se guarda en memoria y, con checkpoint_path, en disco al final.
+    bf16 (autocast) solo se aplica al entrenamiento: la validación que decide
+    el early stopping y el mejor checkpoint se calcula en fp32.
+    """
+    batch_size  = batch_size  or LSTM_BATCH_SIZE
+    num_threads = LSTM_TRAIN_THREADS  if num_threads is None else num_threads
+    num_workers = LSTM_LOADER_WORKERS if num_workers is None else num_workers
+    bf16        = LSTM_BF16    if bf16 is None else bf16
+    use_compile = LSTM_COMPILE if use_compile is None else use_compile
+    quantiles   = LSTM_QUANTILES if quantiles is None else (quantiles or None)
+    if num_threads > 0:
+        torch.set_num_threads(num_threads)
+
+    device       = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    pin          = device.type == "cuda"
+    train_loader = _loader(train_ds, batch_size, True,  num_workers, pin)
+    val_loader   = _loader(val_ds,   batch_size, False, num_workers, pin)
+
+    model     = LSTMModel(input_size=input_size, hidden_size=hidden_size,
+                          num_layers=num_layers, dropout=dropout, horizon=horizon,
+                          quantiles=quantiles).to(device)
+    step_fn   = torch.compile(model) if use_compile else model
+    optimizer = optim.Adam(model.parameters(), lr=1e-3)
+    scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, patience=5, factor=0.5)
+    # Sin cuantiles el modelo no tiene el buffer y sale [batch, horizon]
+    q         = model.quantiles if model.n_quantiles else 0.5
+    out_shape = lambda yb: (*yb.shape, -1) if model.n_quantiles else yb.shape
+    autocast  = lambda: torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=bf16)
+
+    best_val, best_state, counter = float("inf"), None, 0
+    for epoch in range(1, epochs + 1):
+        t0 = time.perf_counter()
+        model.train()
+        train_sum = torch.zeros((), device=device)
+        n_train   = 0
+        for xb, yb in train_loader:
+            xb = xb.to(device, non_blocking=pin)
+            yb = yb.to(device, non_blocking=pin)
+            optimizer.zero_grad(set_to_none=True)
+            with autocast():
+                preds = step_fn(xb).reshape(out_shape(yb))
+            loss = quantile_loss(preds.float(), yb, q)
+            loss.backward()
+            optimizer.step()
+            train_sum += loss.detach() * len(yb)
+            n_train   += len(yb)
+        elapsed = time.perf_counter() - t0
+
+        model.eval()
+        val_sum = torch.zeros((), device=device)
+        n_val   = 0
+        with torch.no_grad():
+            for xb, yb in val_loader:
+                xb = xb.to(device, non_blocking=pin)
+                yb = yb.to(device, non_blocking=pin)
+                preds    = step_fn(xb).reshape(out_shape(yb))
+                val_sum += quantile_loss(preds.float(), yb, q) * len(yb)
+                n_val   += len(yb)
+        mean_val = val_sum.item() / max(n_val, 1)
+        scheduler.step(mean_val)
+
+        if verbose:
+            print(f"Epoch {epoch:03d} | train_loss={train_sum.item() / max(n_train, 1):.6f} "
+                  f"| val_loss={mean_val:.6f} | {n_train / elapsed:,.0f} samples/s")
+        if mean_val < best_val:
+            best_val   = mean_val
+            best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+            counter = 0
+        else:
+            counter += 1
+            if counter >= patience:
+                if verbose:
+                    print("Early stopping.")
+                break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+        if checkpoint_path:
+            torch.save(best_state, checkpoint_path)
+    model.eval()
+    return model, best_val
@@ -0,0 +1,123 @@
+# src/models/panel.py
+
+import re
+import time
+import pandas as pd
+from pathlib import Path
+from typing import IO, Dict, List, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.config import FREQ, MAX_TOTAL_WORKERS, PANEL_KEYS, PANEL_MODEL_DIR, PANEL_WORKERS
+from src.data.ingestion import load_sales_data
+from src.data.preprocessing import preprocess_sales_data
+from src.models.prophet_model import train_prophet
+from src.models.ensemble import fit_and_forecast
+
+
+def series_slug(key: Tuple) -> str:
+    """Nombre de carpeta seguro para una clave de serie."""
+    return "__".join(re.sub(r"[^\w.-]+", "_", str(v)) for v in key)
+
+
+def series_dir(key: Tuple, model_dir: Union[str, Path] = None) -> Path:
+    return Path(model_dir or PANEL_MODEL_DIR) / series_slug(key)
+
+
+def load_panel_data(
+    source: Union[str, IO] = None,
+    keys: List[str] = None,
+    freq: str = None,
+) -> Dict[Tuple, pd.DataFrame]:
+    """
+    Agrupa el CSV por keys + date y preprocesa cada serie por separado.
+    Devuelve {clave (tupla): df_ts}.
+    """
+    keys  = list(keys or PANEL_KEYS)
+    df    = load_sales_data(source, keys=keys)
+    panel = {}
+    for key, grp in df.groupby(keys, sort=True):
+        key = key if isinstance(key, tuple) else (key,)
+        panel[key] = preprocess_sales_data(grp.drop(columns=keys), freq=freq or FREQ)
+    return panel
+
+
+def _fit_series(
+    key: Tuple,
+    df_ts: pd.DataFrame,
+    out_dir: Path,
+    prophet_kwargs: dict,
+) -> Tuple[Tuple, pd.DataFrame, float]:
+    """
+    Prophet + XGB residual para una serie; artefactos en out_dir.
+    """
+    t0 = time.perf_counter()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    prophet_path  = out_dir / "prophet_model.joblib"
+    ensemble_path = out_dir / "xgb_residual.joblib"
+
+    train_prophet(df_ts, model_path=prophet_path, **prophet_kwargs)
+    forecast = fit_and_forecast(df_ts, model_path=prophet_path, ensemble_path=ensemble_path)
+    forecast.to_csv(out_dir / "forecast_ensemble.csv", index=False)
+    return key, forecast, time.perf_counter() - t0
+
+
+def fit_panel(
+    panel: Dict[Tuple, pd.DataFrame],
+    keys: List[str] = None,
+    model_dir: Union[str, Path] = None,
+    n_workers: int = None,
+    **prophet_kwargs,
+) -> pd.DataFrame:
+    """
+    Entrena Prophet + ensemble por serie en un pool de procesos y devuelve
+    un único forecast con las columnas de clave delante. Informa progreso y
+    tiempo por serie; las series que fallan se reportan y se omiten.
+    """
+    keys      = list(keys or PANEL_KEYS)
+    model_dir = Path(model_dir or PANEL_MODEL_DIR)
+    n_workers = n_workers or PANEL_WORKERS or MAX_TOTAL_WORKERS
+    n_workers = max(1, min(n_workers, MAX_TOTAL_WORKERS, len(panel)))
+
+    forecasts, report = [], []
+    total = len(panel)
+    t_start = time.perf_counter()
+
+    def _collect(done, key, result=None, error=None):
+        if error is None:
+            _, fc, elapsed = result
+            fc = fc.copy()
+            for col, val in zip(keys, key):
+                fc.insert(keys.index(col), col, val)
+            forecasts.append(fc)
+            report.append({**dict(zip(keys, key)), "seconds": elapsed, "error": None})
+            print(f"[{done}/{total}] {series_slug(key)} ✓ {elapsed:.1f}s")
+        else:
+            report.append({**dict(zip(keys, key)), "seconds": None, "error": str(error)})
+            print(f"[{done}/{total}] {series_slug(key)} ⚠️  {error}")
+
+    if n_workers == 1:
+        for done, (key, df_ts) in enumerate(panel.items(), start=1):
+            try:
+                _collect(done, key, _fit_series(key, df_ts, series_dir(key, model_dir), prophet_kwargs))
+            except Exception as exc:
+                _collect(done, key, error=exc)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {
+                pool.submit(_fit_series, key, df_ts, series_dir(key, model_dir), prophet_kwargs): key
+                for key, df_ts in panel.items()
+            }
+            for done, fut in enumerate(as_completed(futures), start=1):
+                key = futures[fut]
+                try:
+                    _collect(done, key, fut.result())
+                except Exception as exc:
+                    _collect(done, key, error=exc)
+
+    model_dir.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(report).to_csv(model_dir / "panel_report.csv", index=False)
+    print(f"⏱️  {total} series en {time.perf_counter() - t_start:.1f}s con {n_workers} procesos")
+
+    if not forecasts:
+        return pd.DataFrame(columns=keys + ["date", "yhat", "yhat_lower", "yhat_upper"])
+    return pd.concat(forecasts, ignore_index=True)
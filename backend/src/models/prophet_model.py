@@ -1,12 +1,15 @@
 # src/models/prophet_model.py
 
+import copy
 import pandas as pd
 import numpy as np
+import multiprocessing as mp
 from pathlib import Path
 from itertools import product
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from joblib import dump, load
 from prophet import Prophet
-from prophet.diagnostics import cross_validation, performance_metrics
+from prophet.diagnostics import cross_validation, performance_metrics, generate_cutoffs
 
 from src.config import (
     PROPHET_SEASONALITY_MODE,
@@ -17,12 +20,25 @@ from src.config import (
     SEASONALITY_PRIOR_SCALES,
     LOG_TRANSFORM,
     CHANGEPNT_RANGE,
+    MAX_TOTAL_WORKERS,
+    TUNE_WORKERS,
+    TUNE_PRUNE_MIN_FOLDS,
+    TUNE_PRUNE_TOLERANCE,
+    PROPHET_REDUCED_SAMPLES,
 )
 from src.data.preprocessing import inverse_log_transform
 
 MODEL_DIR = Path("models")
 MODEL_DIR.mkdir(exist_ok=True)
 
+# Modos de predicción, del más barato al más caro:
+#   components → ds, trend, componentes estacionales / regresores y yhat (sin predict())
+#   point      → salida de predict() sin intervalos (uncertainty_samples=0)
+#   reduced    → intervalos con PROPHET_REDUCED_SAMPLES simulaciones
+#   full       → intervalos con las simulaciones del modelo (1000 por defecto)
+# Cada modo da al menos las columnas de los anteriores.
+PREDICT_MODES = ("components", "point", "reduced", "full")
+
 
 def _add_date_regressors(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
@@ -54,25 +70,12 @@ def _get_special_events(years):
     return pd.DataFrame(events)
 
 
-def train_prophet(
-    df: pd.DataFrame,
-    model_path: Path = MODEL_DIR / "prophet_model.joblib",
-    changepoint_prior_scale: float = None,
-    seasonality_prior_scale: float = None,
+def _build_model(
+    df_prop: pd.DataFrame,
+    cps: float,
+    sps: float,
     **prophet_kwargs
 ) -> Prophet:
-    # 1) Preparo ds / y
-    df_prop = df.reset_index().rename(columns={"date": "ds", "sales": "y"})
-    if LOG_TRANSFORM:
-        df_prop["y"] = np.log(df_prop["y"] + 1)
-
-    # 2) Regresores temporales
-    df_prop = _add_date_regressors(df_prop)
-
-    # 3) Hiperparámetros CPS / SPS
-    cps = changepoint_prior_scale or CP_PRIOR_SCALES[0]
-    sps = seasonality_prior_scale or SEASONALITY_PRIOR_SCALES[0]
-
     # 4) Inicializo Prophet (lineal) con seasonality multiplicativa
     m = Prophet(
         growth="linear",
@@ -123,18 +126,123 @@ def train_prophet(
     years   = sorted(df_prop["ds"].dt.year.unique())
     special = _get_special_events(years)
     m.holidays = pd.concat([m.holidays, special], ignore_index=True)
+    return m
 
-    # 8) Entrenar y guardar
-    m.fit(df_prop)
+
+def train_prophet(
+    df: pd.DataFrame,
+    model_path: Path = MODEL_DIR / "prophet_model.joblib",
+    changepoint_prior_scale: float = None,
+    seasonality_prior_scale: float = None,
+    warm_start: bool = False,
+    init_model_path: Path = None,
+    **prophet_kwargs
+) -> Prophet:
+    """
+    Con warm_start=True y un modelo previo en init_model_path (por defecto
+    model_path), arranca el optimizador desde sus parámetros (k, m, delta,
+    beta, sigma_obs) y reutiliza sus CPS / SPS si no se pasan otros.
+    Si el modelo previo no es compatible se ajusta en frío.
+    """
+    prev = None
+    init_model_path = Path(init_model_path or model_path)
+    if warm_start and init_model_path.exists():
+        prev = load(init_model_path)
+        changepoint_prior_scale = changepoint_prior_scale or prev.changepoint_prior_scale
+        seasonality_prior_scale = seasonality_prior_scale or prev.seasonality_prior_scale
+
+    # 1) Preparo ds / y
+    df_prop = df.reset_index().rename(columns={"date": "ds", "sales": "y"})
+    if LOG_TRANSFORM:
+        df_prop["y"] = np.log(df_prop["y"] + 1)
+
+    # 2) Regresores temporales
+    df_prop = _add_date_regressors(df_prop)
+
+    # 3) Hiperparámetros CPS / SPS
+    cps = changepoint_prior_scale or CP_PRIOR_SCALES[0]
+    sps = seasonality_prior_scale or SEASONALITY_PRIOR_SCALES[0]
+
+    # 4-7) Prophet con regresores, estacionalidades y festivos
+    m = _build_model(df_prop, cps, sps, **prophet_kwargs)
+
+    # 8) Entrenar (warm-start si hay modelo previo) y guardar
+    if prev is not None:
+        try:
+            m.fit(df_prop, init=warm_start_params(prev))
+        except Exception as exc:
+            print(f"⚠️  Warm-start no aplicable ({exc}); ajuste en frío")
+            m = _build_model(df_prop, cps, sps, **prophet_kwargs)
+            m.fit(df_prop)
+    else:
+        m.fit(df_prop)
     dump(m, model_path)
     return m
 
 
+def warm_start_params(m: Prophet) -> dict:
+    """
+    Parámetros ajustados de m en el formato `init` del backend de Stan.
+    """
+    res = {}
+    for pname in ["k", "m", "sigma_obs"]:
+        if m.mcmc_samples == 0:
+            res[pname] = m.params[pname][0][0]
+        else:
+            res[pname] = np.mean(m.params[pname])
+    for pname in ["delta", "beta"]:
+        if m.mcmc_samples == 0:
+            res[pname] = m.params[pname][0]
+        else:
+            res[pname] = np.mean(m.params[pname], axis=0)
+    return res
+
+
+def _predict_components(m: Prophet, future: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tendencia + todos los componentes en un único producto matricial
+    (features estacionales × beta), sin simulaciones ni percentiles.
+    Mismos valores que las columnas homónimas de m.predict(future).
+    """
+    df    = m.setup_dataframe(future.copy())
+    trend = m.predict_trend(df)
+    features, _, component_cols, _ = m.make_all_seasonality_features(df)
+    beta  = np.mean(m.params["beta"], axis=0)
+
+    comps = features.to_numpy() @ (component_cols.to_numpy() * beta[:, None])
+    comps = pd.DataFrame(comps, columns=component_cols.columns, index=df.index)
+    additive = [c for c in comps.columns if c in m.component_modes["additive"]]
+    comps[additive] *= m.y_scale
+
+    comps.insert(0, "ds", df["ds"])
+    comps.insert(1, "trend", trend)
+    comps["yhat"] = trend * (1 + comps["multiplicative_terms"]) + comps["additive_terms"]
+    return comps
+
+
+def predict_with_mode(m: Prophet, future: pd.DataFrame, mode: str = "full") -> pd.DataFrame:
+    """
+    m.predict(future) con el coste que pida el llamador (ver PREDICT_MODES).
+    point / reduced usan una copia superficial del modelo con menos
+    uncertainty_samples; el modelo original no se modifica.
+    """
+    if mode not in PREDICT_MODES:
+        raise ValueError(f"mode debe ser uno de {PREDICT_MODES}, no {mode!r}")
+    if mode == "components":
+        return _predict_components(m, future)
+    if mode == "full":
+        return m.predict(future)
+    m = copy.copy(m)
+    m.uncertainty_samples = 0 if mode == "point" else min(PROPHET_REDUCED_SAMPLES, m.uncertainty_samples)
+    return m.predict(future)
+
+
 def predict_prophet(
     model: Prophet = None,
     periods: int = None,
     freq: str = None,
     model_path: Path = MODEL_DIR / "prophet_model.joblib",
+    mode: str = "full",
 ) -> pd.DataFrame:
     from src.config import HORIZON_DAYS, FREQ
 
@@ -148,15 +256,16 @@ def predict_prophet(
     future = model.make_future_dataframe(periods=periods, freq=freq)
     future = _add_date_regressors(future)
 
-    # 2) Predecir
-    fcst = model.predict(future)
+    # 2) Predecir (sin intervalos en modos point / components)
+    fcst = predict_with_mode(model, future, mode)
+    cols = [c for c in ["yhat","yhat_lower","yhat_upper"] if c in fcst.columns]
 
     # 3) Invertir log si aplica
     if LOG_TRANSFORM:
-        for c in ["yhat","yhat_lower","yhat_upper"]:
+        for c in cols:
             fcst[c] = inverse_log_transform(fcst[c])
 
-    return fcst[["ds","yhat","yhat_lower","yhat_upper"]]
+    return fcst[["ds"] + cols]
 
 
 def load_model(
@@ -165,47 +274,116 @@ def load_model(
     return load(model_path)
 
 
+# Mejor MAPE global compartido entre los workers del grid search
+_SHARED_BEST = None
+
+
+def _init_tune_worker(shared_best) -> None:
+    global _SHARED_BEST
+    _SHARED_BEST = shared_best
+
+
+def _build_tune_model(cps: float, sps: float) -> Prophet:
+    m = Prophet(
+        growth="linear",
+        seasonality_mode="multiplicative",
+        daily_seasonality=False,
+        weekly_seasonality=False,
+        yearly_seasonality=False,
+        changepoint_prior_scale=cps,
+        seasonality_prior_scale=sps,
+        changepoint_range=0.95,
+        n_changepoints=25,
+        mcmc_samples=0,
+    )
+    for reg in ["dayofweek","is_weekend","month","quarter"]:
+        m.add_regressor(reg)
+    m.add_seasonality("weekly",  period=7,    fourier_order=3)
+    m.add_seasonality("monthly", period=30.5, fourier_order=5)
+    m.add_seasonality("quarterly", period=91.31, fourier_order=3)
+    return m
+
+
+def _score_candidate(
+    df_prop: pd.DataFrame,
+    cps: float,
+    sps: float,
+    initial: str,
+    period: str,
+    horizon: str,
+    prune_min_folds: int,
+    prune_tolerance: float,
+) -> dict:
+    """
+    Ajusta un candidato y evalúa sus folds uno a uno; abandona en cuanto
+    el MAPE parcial supera al mejor global (con margen prune_tolerance).
+    """
+    m = _build_tune_model(cps, sps)
+    m.fit(df_prop)
+
+    cutoffs = generate_cutoffs(
+        m.history.copy().reset_index(drop=True),
+        pd.Timedelta(horizon), pd.Timedelta(initial), pd.Timedelta(period),
+    )
+    folds = []
+    for i, cutoff in enumerate(cutoffs, start=1):
+        folds.append(cross_validation(m, horizon=horizon, cutoffs=[cutoff], disable_tqdm=True))
+        mape = performance_metrics(pd.concat(folds, ignore_index=True))["mape"].mean()
+
+        if i >= prune_min_folds and i < len(cutoffs):
+            if mape > _SHARED_BEST.value * (1 + prune_tolerance):
+                return {"cps": cps, "sps": sps, "mape": mape, "folds": i, "pruned": True}
+
+    with _SHARED_BEST.get_lock():
+        if mape < _SHARED_BEST.value:
+            _SHARED_BEST.value = mape
+    return {"cps": cps, "sps": sps, "mape": mape, "folds": len(cutoffs), "pruned": False}
+
+
 def tune_prophet(
     df: pd.DataFrame,
     initial: str = "730 days",
     period:  str = "90 days",
-    horizon: str = "90 days"
+    horizon: str = "90 days",
+    n_workers: int = None,
 ) -> dict:
     """
     Grid search optimizando MAPE con validación cruzada.
+    Los candidatos se reparten en un pool de procesos (n_workers o TUNE_WORKERS,
+    acotado por MAX_TOTAL_WORKERS); los folds de cada candidato van en serie
+    para poder podar los que ya son peores que el mejor actual.
     """
     df_prop = df.reset_index().rename(columns={"date":"ds","sales":"y"})
     if LOG_TRANSFORM:
         df_prop["y"] = np.log(df_prop["y"] + 1)
     df_prop = _add_date_regressors(df_prop)
 
-    best = {"mape": float("inf"), "cps": None, "sps": None}
-    for cps, sps in product(CP_PRIOR_SCALES, SEASONALITY_PRIOR_SCALES):
-        m = Prophet(
-            growth="linear",
-            seasonality_mode="multiplicative",
-            daily_seasonality=False,
-            weekly_seasonality=False,
-            yearly_seasonality=False,
-            changepoint_prior_scale=cps,
-            seasonality_prior_scale=sps,
-            changepoint_range=0.95,
-            n_changepoints=25,
-            mcmc_samples=0,
-        )
-        for reg in ["dayofweek","is_weekend","month","quarter"]:
-            m.add_regressor(reg)
-        m.add_seasonality("weekly",  period=7,    fourier_order=3)
-        m.add_seasonality("monthly", period=30.5, fourier_order=5)
-        m.add_seasonality("quarterly", period=91.31, fourier_order=3)
+    grid      = list(product(CP_PRIOR_SCALES, SEASONALITY_PRIOR_SCALES))
+    n_workers = n_workers or TUNE_WORKERS or MAX_TOTAL_WORKERS
+    n_workers = max(1, min(n_workers, MAX_TOTAL_WORKERS, len(grid)))
+    args      = (initial, period, horizon, TUNE_PRUNE_MIN_FOLDS, TUNE_PRUNE_TOLERANCE)
 
-        m.fit(df_prop)
-        df_cv = cross_validation(
-            m, initial=initial, period=period, horizon=horizon, parallel="processes"
-        )
-        perf = performance_metrics(df_cv)
-        mape = perf["mape"].mean()
-        if mape < best["mape"]:
-            best.update({"mape": mape, "cps": cps, "sps": sps})
+    ctx         = mp.get_context()
+    shared_best = ctx.Value("d", float("inf"))
+    trials      = []
+    if n_workers == 1:
+        _init_tune_worker(shared_best)
+        for cps, sps in grid:
+            trials.append(_score_candidate(df_prop, cps, sps, *args))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=ctx,
+            initializer=_init_tune_worker,
+            initargs=(shared_best,),
+        ) as pool:
+            futures = [pool.submit(_score_candidate, df_prop, cps, sps, *args) for cps, sps in grid]
+            for fut in as_completed(futures):
+                trials.append(fut.result())
 
+    best = {"mape": float("inf"), "cps": None, "sps": None}
+    for t in trials:
+        if not t["pruned"] and t["mape"] < best["mape"]:
+            best.update({"mape": t["mape"], "cps": t["cps"], "sps": t["sps"]})
+    best["trials"] = trials
     return best
@@ -0,0 +1,124 @@
+# src/serving/batch.py
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import torch
+
+from src.config import FREQ
+from src.features.lstm_features import LSTM_FEATURES, LSTM_WINDOWS, enrich_features
+from src.models.ensemble import _feature_matrix, _frame, _rows
+from src.models.LSTM_model import quantile_bands
+from src.models.prophet_model import _add_date_regressors, predict_with_mode
+from src.serving.instrumentation import METRICS
+
+# Columnas que espera /predict-csv (otras_vars se acepta, pero el LSTM
+# entrenado no la usa)
+INPUT_COLUMNS = ["fecha", "ventas_previas", "otras_vars"]
+# Filas previas que necesitan las ventanas rodantes del LSTM: se pasan
+# como context al puntuar el chunk siguiente del mismo CSV
+CONTEXT_ROWS  = max(LSTM_WINDOWS) - 1
+
+
+def lstm_matrix(df: pd.DataFrame, lstm_scaler, context: pd.DataFrame = None) -> np.ndarray:
+    """
+    Las LSTM_FEATURES escaladas (el orden del scaler guardado) de cada fila:
+    ventas_previas hace de sales y fecha de índice, con las mismas
+    enrich_features del entrenamiento. El suavizado usa los límites que vio
+    el scaler y context (filas anteriores) completa las ventanas rodantes,
+    así el resultado no depende de cómo se trocee el CSV.
+    """
+    n_expected = getattr(lstm_scaler, "n_features_in_", len(LSTM_FEATURES))
+    if n_expected != len(LSTM_FEATURES):
+        raise ValueError(
+            f"El scaler del LSTM espera {n_expected} columnas y LSTM_FEATURES tiene "
+            f"{len(LSTM_FEATURES)}; reentrena con train_lstm.py"
+        )
+    rows   = df if context is None else pd.concat([context, df])
+    series = pd.DataFrame(
+        {"sales": rows["ventas_previas"].to_numpy(dtype=float)},
+        index=pd.DatetimeIndex(pd.to_datetime(rows["fecha"]), name="date"),
+    )
+    target = LSTM_FEATURES.index("sales_log")
+    bounds = tuple(np.expm1([lstm_scaler.data_min_[target], lstm_scaler.data_max_[target]]))
+    feats  = enrich_features(series, clip_bounds=bounds)[LSTM_FEATURES]
+    return lstm_scaler.transform(feats.to_numpy(dtype=float)[len(rows) - len(df):])
+
+
+def residual_matrix(prophet_model, dates: pd.DatetimeIndex) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """
+    (yhat de Prophet, columnas, filas de la matriz del XGB de residuos) para
+    dates. Se calcula sobre el rango continuo desde el inicio del histórico
+    del modelo, como en train_ensemble, para que los rezagos y las ventanas
+    de hasta 365 días coincidan con el entrenamiento.
+    """
+    history = prophet_model.history["ds"]
+    start   = min(history.min(), dates.min())
+    end     = max(history.max(), dates.max())
+    future  = _add_date_regressors(pd.DataFrame({"ds": pd.date_range(start, end, freq=FREQ)}))
+    fcst    = predict_with_mode(prophet_model, future, "components").set_index("ds")
+    index, cols, values = _feature_matrix(fcst)
+    rows = _rows(index, dates)
+    return fcst["yhat"].to_numpy()[rows], cols, values[rows]
+
+
+def predict_batch(
+    df: pd.DataFrame,
+    lstm_scaler,
+    lstm_model: torch.nn.Module,
+    prophet_model,
+    xgb_model,
+    context: pd.DataFrame = None,
+) -> list:
+    """
+    Versión vectorizada del scoring fila a fila de /predict-csv:
+    construye y escala las features del LSTM de todo el frame de una vez,
+    hace un único forward del LSTM, un único predict de Prophet (rango
+    continuo de fechas) y uno de XGBoost. Cada etapa queda medida en
+    METRICS (latencia y filas). context son las filas previas del mismo
+    CSV (ver CONTEXT_ROWS).
+    Devuelve la lista de dicts {fecha, lstm, ensemble, yhat_lower, yhat_upper};
+    el intervalo sale de los cuantiles del LSTM en el mismo forward
+    (None si el modelo servido no tiene cuantiles).
+    """
+    missing = set(INPUT_COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"Faltan columnas en el CSV: {missing}")
+    if df.empty:
+        return []
+
+    # — LSTM: [n, 1, features] → un solo forward —
+    n = len(df)
+    with METRICS.stage("scaler", n):
+        arr    = lstm_matrix(df, lstm_scaler, context)
+        tensor = torch.as_tensor(arr, dtype=torch.float32).unsqueeze(1)
+    with METRICS.stage("lstm", n), torch.no_grad():
+        point, lower, upper = quantile_bands(lstm_model(tensor))
+    first  = lambda a: None if a is None else a.reshape(n, -1)[:, 0]  # primer paso
+    p_lstm, p_low, p_up = first(point), first(lower), first(upper)
+
+    # — Prophet: solo yhat y componentes (sin simulaciones de intervalos) —
+    with METRICS.stage("prophet", n):
+        dates = pd.DatetimeIndex(pd.to_datetime(df["fecha"]))
+        p_prop, cols, feats = residual_matrix(prophet_model, dates)
+
+    # — XGB residual sobre toda la matriz —
+    with METRICS.stage("xgb", n):
+        p_xgb = np.asarray(xgb_model.predict(_frame(feats[:, 1:], cols[1:])))
+
+    # — Ensamble final —
+    p_ens = p_lstm + p_prop + p_xgb
+
+    if p_low is None:
+        p_low = p_up = [None] * len(df)
+    return [
+        {
+            "fecha":      fecha,
+            "lstm":       float(l),
+            "ensemble":   float(e),
+            "yhat_lower": None if lo is None else float(lo),
+            "yhat_upper": None if up is None else float(up),
+        }
+        for fecha, l, e, lo, up in zip(df["fecha"].tolist(), p_lstm, p_ens, p_low, p_up)
+    ]
@@ -0,0 +1,63 @@
+# src/serving/executor.py
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from fastapi import HTTPException
+
+
+class InferenceExecutor:
+    """
+    Ejecuta el trabajo CPU (pandas / torch / Prophet) fuera del event loop,
+    en un pool de max_workers hilos. Admite como mucho max_queue peticiones
+    esperando; por encima responde 429 en lugar de encolar sin límite.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max(1, max_workers)
+        self.max_queue   = max(0, max_queue)
+        self._pool       = ThreadPoolExecutor(max_workers=self.max_workers,
+                                              thread_name_prefix="inference")
+        # En ejecución + en cola. Solo se modifica desde el event loop
+        # (el descuento llega con call_soon_threadsafe), así que no necesita lock.
+        self._pending    = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        if self._pending >= self.capacity:
+            raise HTTPException(
+                status_code=429,
+                detail="Servicio de inferencia saturado, reintenta en unos segundos",
+                headers={"Retry-After": "1"},
+            )
+        loop   = asyncio.get_running_loop()
+        future = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        self._pending += 1
+        # Se libera cuando termina el trabajo, no cuando deja de esperarse:
+        # si el cliente se desconecta el hilo sigue ocupado hasta acabar
+        future.add_done_callback(lambda _: self._release(loop))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        def dec():
+            self._pending -= 1
+        try:
+            loop.call_soon_threadsafe(dec)
+        except RuntimeError:  # loop ya cerrado (apagado)
+            pass
+
+    def status(self) -> dict:
+        return {
+            "workers":  self.max_workers,
+            "running":  min(self._pending, self.max_workers),
+            "queued":   max(0, self._pending - self.max_workers),
+            "capacity": self.capacity,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,115 @@
+# src/serving/forecasts.py
+
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+from src.config import FORECAST_CACHE_SIZE, FREQ
+from src.data.preprocessing import inverse_log_transform
+from src.models.prophet_model import _add_date_regressors, predict_with_mode
+from src.serving.registry import ModelBundle, ModelRegistry
+
+# Modelos servidos por GET /forecast; los precalculados se leen de su CSV
+FORECAST_MODELS = ("ensemble", "prophet", "lstm")
+FORECAST_FILES  = {
+    "ensemble": "forecast_ensemble.csv",
+    "lstm":     "forecast_lstm.csv",
+}
+COLUMNS = ["date", "yhat", "yhat_lower", "yhat_upper"]
+
+
+@dataclass(frozen=True)
+class CachedForecast:
+    etag: str
+    body: bytes   # JSON ya serializado: un acierto no vuelve a codificar
+
+
+class ForecastCache:
+    """
+    LRU en memoria de respuestas de /forecast por (versión del registro,
+    modelo, horizonte). Se vacía cuando el registro carga una versión
+    nueva; aun sin vaciarla, una clave de versión vieja no vuelve a usarse.
+    """
+
+    def __init__(self, registry: ModelRegistry, max_entries: int = FORECAST_CACHE_SIZE):
+        self.registry    = registry
+        self.max_entries = max(1, max_entries)
+        self._entries    = OrderedDict()
+        self._lock       = threading.Lock()
+        self.hits        = 0
+        self.misses      = 0
+        registry.add_listener(self.clear)
+
+    def lookup(self, model: str, horizon: int) -> Optional[CachedForecast]:
+        """Acierto sin cargar nada (seguro desde el event loop); None si falla."""
+        version = self.registry.version
+        with self._lock:
+            entry = self._entries.get((version, model, horizon))
+            if entry is not None:
+                self._entries.move_to_end((version, model, horizon))
+                self.hits += 1
+        return entry
+
+    def get(self, model: str, horizon: int) -> CachedForecast:
+        """Como lookup, pero calcula y guarda la respuesta si no está."""
+        entry = self.lookup(model, horizon)
+        if entry is not None:
+            return entry
+
+        bundle = self.registry.get()
+        frame  = self._compute(bundle, model, horizon)
+        frame  = frame.assign(date=pd.to_datetime(frame["date"]).dt.strftime("%Y-%m-%d"))
+        payload = {
+            "model":    model,
+            "horizon":  len(frame),
+            "version":  bundle.version,
+            "forecast": frame[COLUMNS].to_dict(orient="records"),
+        }
+        entry = CachedForecast(
+            etag=f'"{bundle.version}-{model}-{horizon}"',
+            body=json.dumps(payload).encode(),
+        )
+        key = (bundle.version, model, horizon)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _compute(self, bundle: ModelBundle, model: str, horizon: int) -> pd.DataFrame:
+        if model == "prophet":
+            # Solo las fechas futuras, con el modelo del propio bundle: el
+            # resultado queda en esta LRU (clave con la versión), no en el memo global
+            future = bundle.prophet.make_future_dataframe(periods=horizon, freq=FREQ).tail(horizon)
+            fc     = predict_with_mode(bundle.prophet, _add_date_regressors(future), "full")
+            out = fc.rename(columns={"ds": "date"})[COLUMNS].copy()
+            for col in COLUMNS[1:]:
+                out[col] = inverse_log_transform(out[col])
+            return out
+
+        path = self.registry.model_dir / FORECAST_FILES[model]
+        if not path.exists():
+            raise LookupError(f"No hay forecast precalculado para '{model}' ({path.name})")
+        fc = pd.read_csv(path)
+        for col in COLUMNS[2:]:
+            if col not in fc.columns:
+                fc[col] = None
+        return fc.head(horizon)
+
+    def clear(self, bundle: ModelBundle = None) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> dict:
+        return {
+            "entries":     len(self._entries),
+            "max_entries": self.max_entries,
+            "hits":        self.hits,
+            "misses":      self.misses,
+        }
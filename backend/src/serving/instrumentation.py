@@ -0,0 +1,207 @@
+# src/serving/instrumentation.py
+
+import cProfile
+import random
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.config import PROFILE_ENABLED, PROFILE_MAX_FILES, PROFILE_SAMPLE_RATE
+
+# Buckets (segundos) de latencia: de 0.5 ms a 30 s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Buckets de filas por petición
+ROWS_BUCKETS    = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+PROFILE_HEADER  = "x-profile"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Contador monótono por combinación de etiquetas."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name    = name
+        self.help    = help
+        self.labels  = tuple(labels)
+        self._values: Dict[tuple, float] = {}
+        self._lock   = threading.Lock()
+
+    def inc(self, amount: float = 1, *label_values) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labels, k)} {_number(v)}" for k, v in items]
+
+
+class Histogram:
+    """
+    Histograma al estilo Prometheus (buckets acumulativos `le`, _sum y
+    _count) por combinación de etiquetas. observe() es O(log buckets).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name    = name
+        self.help    = help
+        self.labels  = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, Tuple[List[int], List[float]]] = {}
+        self._lock   = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        i = bisect_left(self.buckets, value)   # primer bucket con value <= le
+        with self._lock:
+            counts, total = self._series.setdefault(
+                label_values, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[i] += 1
+            total[0]  += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(c), t[0]) for k, (c, t) in self._series.items())
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for le, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bound = "+Inf" if le == float("inf") else _number(le)
+                le_kv = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le_kv)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """
+    Métricas del servicio en memoria, expuestas en formato de texto de
+    Prometheus por GET /metrics (sin dependencias ni servicios externos).
+    Las etapas de inferencia se miden con `with METRICS.stage("lstm", rows):`.
+    """
+
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            "inference_stage_seconds", "Latencia de cada etapa de inferencia", ["stage"])
+        self.stage_rows    = Counter(
+            "inference_stage_rows_total", "Filas procesadas por etapa", ["stage"])
+        self.request_rows  = Histogram(
+            "predict_rows_per_request", "Filas por petición de /predict-csv", buckets=ROWS_BUCKETS)
+        self.http_seconds  = Histogram(
+            "http_request_duration_seconds", "Latencia de las peticiones HTTP", ["path"])
+        self.http_requests = Counter(
+            "http_requests_total", "Peticiones HTTP por ruta y código", ["path", "status"])
+        self.profiles      = Counter(
+            "request_profiles_total", "Peticiones perfiladas con cProfile")
+        self._metrics      = [self.stage_seconds, self.stage_rows, self.request_rows,
+                              self.http_seconds, self.http_requests, self.profiles]
+        self._gauges: List[Tuple[str, str, str, Callable[[], float]]] = []
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds.observe(time.perf_counter() - t0, name)
+            if rows is not None:
+                self.stage_rows.inc(rows, name)
+
+    def register_gauge(self, name: str, help: str, fn: Callable[[], float], kind: str = "gauge") -> None:
+        """fn() se evalúa en cada scrape (p.ej. estado del pool o de la caché)."""
+        self._gauges.append((name, help, kind, fn))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}"]
+            lines += metric.samples()
+        for name, help, kind, fn in self._gauges:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_number(fn())}"]
+        return "\n".join(lines) + "\n"
+
+
+# Registro del proceso: lo usan el motor batch y main.py
+METRICS = Metrics()
+
+
+class RequestProfiler:
+    """
+    cProfile opcional por petición para depurar en producción. Solo actúa
+    con PROFILE_ENABLED: cuando la petición trae X-Profile: 1 o, al azar,
+    en una fracción sample_rate. El volcado .prof (legible con pstats /
+    snakeviz) queda en out_dir, que conserva como mucho max_files volcados.
+    """
+
+    def __init__(self, out_dir: Path, enabled: bool = PROFILE_ENABLED,
+                 sample_rate: float = PROFILE_SAMPLE_RATE, max_files: int = PROFILE_MAX_FILES):
+        self.out_dir     = Path(out_dir)
+        self.enabled     = enabled
+        self.sample_rate = sample_rate
+        self.max_files   = max_files
+        # Un solo perfil a la vez: en Python 3.12+ cProfile usa sys.monitoring,
+        # que es global al proceso, y un segundo enable() concurrente falla
+        self._lock       = threading.Lock()
+
+    def wanted(self, headers) -> bool:
+        if not self.enabled:
+            return False
+        if headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+            return True
+        return random.random() < self.sample_rate
+
+    def call(self, name: str, fn: Callable, *args, **kwargs) -> Tuple[object, Optional[Path]]:
+        """
+        Ejecuta fn perfilándola (se llama dentro del pool de inferencia).
+        Devuelve (resultado, ruta); si ya hay otra petición perfilándose, fn
+        corre sin perfilar y la ruta es None.
+        """
+        if not self._lock.acquire(blocking=False):
+            return fn(*args, **kwargs), None
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                profiler.disable()
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path = self.out_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{uuid.uuid4().hex[:8]}.prof"
+            profiler.dump_stats(str(path))
+            self._prune()
+        finally:
+            self._lock.release()
+        METRICS.profiles.inc()
+        return result, path
+
+    def _prune(self) -> None:
+        """Borra los .prof más antiguos por encima de max_files."""
+        dumps = sorted(self.out_dir.glob("*.prof"), key=lambda p: p.stat().st_mtime)
+        for old in dumps[:max(len(dumps) - max(self.max_files, 1), 0)]:
+            old.unlink(missing_ok=True)
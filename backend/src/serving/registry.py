@@ -0,0 +1,173 @@
+# src/serving/registry.py
+
+import time
+import hashlib
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+import joblib
+import torch
+
+from src.config import LSTM_RUNTIME
+from src.models.lstm_export import load_eager, load_onnx, load_torchscript
+
+# Artefacto del LSTM según LSTM_RUNTIME
+LSTM_ARTIFACTS = {
+    "eager":       "lstm_quantile.pth",
+    "torchscript": "lstm_quantile.ts",
+    "onnx":        "lstm_quantile.onnx",
+}
+if LSTM_RUNTIME not in LSTM_ARTIFACTS:
+    raise ValueError(f"LSTM_RUNTIME desconocido: {LSTM_RUNTIME!r} (opciones: {list(LSTM_ARTIFACTS)})")
+
+# Nombre lógico → fichero dentro del directorio de artefactos
+ARTIFACT_FILES = {
+    "lstm_scaler": "lstm_scaler.pkl",
+    "lstm":        LSTM_ARTIFACTS[LSTM_RUNTIME],
+    "prophet":     "prophet_model.joblib",
+    "xgb":         "xgb_residual_adv_fixed.joblib",
+}
+
+
+# Ficheros que no se cargan pero versionan el bundle si existen
+# (forecasts precalculados que sirve GET /forecast)
+WATCHED_FILES = ["forecast_ensemble.csv", "forecast_lstm.csv"]
+
+
+# Cargador por artefacto (por defecto joblib)
+LOADERS: Dict[str, Callable[[Path], object]] = {
+    "lstm": {"eager": load_eager, "torchscript": load_torchscript, "onnx": load_onnx}[LSTM_RUNTIME],
+}
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    Versión inmutable de todos los artefactos. Una petición toma el bundle
+    una vez y lo usa entero, así una recarga nunca mezcla versiones.
+    """
+    version:      str
+    lstm_scaler:  object
+    lstm:         torch.nn.Module
+    prophet:      object
+    xgb:          object
+    load_timings: Dict[str, float] = field(default_factory=dict)
+    loaded_at:    float = 0.0
+
+
+class ModelRegistry:
+    """
+    Carga perezosa (primer get()) y recarga atómica de los artefactos de
+    model_dir. La versión es un hash de nombre/tamaño/mtime de cada fichero.
+    """
+
+    def __init__(self, model_dir: Path):
+        self.model_dir   = Path(model_dir)
+        self._bundle     = None
+        self._load_lock  = threading.Lock()
+        self._listeners: List[Callable[[ModelBundle], None]] = []
+        self._stop       = threading.Event()
+        self._watcher    = None
+
+    # — Versionado —
+    def fingerprint(self) -> str:
+        h = hashlib.blake2b(digest_size=8)
+        for name, fname in sorted(ARTIFACT_FILES.items()):
+            st = (self.model_dir / fname).stat()
+            h.update(f"{name}:{st.st_size}:{st.st_mtime_ns};".encode())
+        for fname in WATCHED_FILES:
+            path = self.model_dir / fname
+            if path.exists():
+                st = path.stat()
+                h.update(f"{fname}:{st.st_size}:{st.st_mtime_ns};".encode())
+        return h.hexdigest()
+
+    @property
+    def version(self):
+        """Versión cargada (None si aún no se cargó nada)."""
+        bundle = self._bundle
+        return None if bundle is None else bundle.version
+
+    # — Carga —
+    def _load(self, version: str) -> ModelBundle:
+        models, timings = {}, {}
+        for name, fname in ARTIFACT_FILES.items():
+            t0 = time.perf_counter()
+            models[name]  = LOADERS.get(name, joblib.load)(self.model_dir / fname)
+            timings[name] = time.perf_counter() - t0
+        return ModelBundle(version=version, load_timings=timings,
+                           loaded_at=time.time(), **models)
+
+    def get(self) -> ModelBundle:
+        bundle = self._bundle
+        if bundle is None:
+            bundle = self.reload()
+        return bundle
+
+    def reload(self, force: bool = False) -> ModelBundle:
+        """
+        Carga una versión nueva completa y la publica de golpe; las peticiones
+        en curso terminan con el bundle que ya tenían.
+        """
+        with self._load_lock:
+            version = self.fingerprint()
+            current = self._bundle
+            if current is not None and current.version == version and not force:
+                return current
+            bundle = self._load(version)
+            self._bundle = bundle
+        for listener in self._listeners:
+            listener(bundle)
+        return bundle
+
+    def add_listener(self, fn: Callable[[ModelBundle], None]) -> None:
+        """fn(bundle) se llama tras cada carga (p.ej. para invalidar cachés)."""
+        self._listeners.append(fn)
+
+    def status(self) -> dict:
+        bundle = self._bundle
+        if bundle is None:
+            return {"loaded": False}
+        return {
+            "loaded":       True,
+            "version":      bundle.version,
+            "lstm_runtime": LSTM_RUNTIME,
+            "loaded_at":    bundle.loaded_at,
+            "load_timings": bundle.load_timings,
+        }
+
+    # — Vigilancia de model_dir —
+    def _watch(self, interval: float) -> None:
+        seen = None
+        while not self._stop.wait(interval):
+            try:
+                version = self.fingerprint()
+            except FileNotFoundError:
+                continue  # artefacto a medio reescribir
+            # Solo recarga si la versión no cambió entre dos sondeos (escritura terminada)
+            stable, seen = version == seen, version
+            current = self._bundle
+            if current is None or not stable or version == current.version:
+                continue
+            try:
+                self.reload()
+                print(f"🔄 Modelos recargados → versión {version}")
+            except Exception as exc:
+                print(f"⚠️  Recarga fallida, se mantiene {current.version}: {exc}")
+
+    def start_watcher(self, interval: float) -> None:
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="model-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -0,0 +1,36 @@
+# tests/test_metrics.py
+#   python -m pytest tests
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from src.evaluation.metrics import score_frame, score_matrix
+
+
+def test_score_frame_missing_group_key():
+    df = pd.DataFrame({
+        "model":  ["a", "a", None, None, "b", "b"],
+        "y_true": [1.0, 2.0, 3.0, 5.0, 4.0, 6.0],
+        "y_pred": [1.5, 2.0, 3.0, 4.0, 4.0, 7.0],
+    })
+    scores = score_frame(df, "model")
+    assert len(scores) == 3
+    assert scores["n"].tolist() == [2, 2, 2]
+    missing = scores[scores["model"].isna()].iloc[0]
+    assert missing["MAE"] == 0.5
+    assert missing["MASE"] == 0.5 / 2.0
+
+
+def test_mase_scale_skips_gaps():
+    # El hueco de y_true no une 1 con 10: el naive solo ve |2 - 1| y |11 - 10|
+    y_true = np.array([1.0, 2.0, np.nan, 10.0, 11.0])
+    y_pred = y_true + 1
+    y_pred[2] = 0.0
+    scores = score_matrix(y_true, y_pred).iloc[0]
+    assert scores["n"] == 4
+    assert scores["MASE"] == 1.0
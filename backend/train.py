@@ -3,26 +3,30 @@
 #!/usr/bin/env python3
 
 import os
-from src.config import FREQ
-from src.data.ingestion import load_and_prepare_data
-from src.data.preprocessing import preprocess_sales_data
-from src.models.prophet_model import tune_prophet, train_prophet
+from src.config import FREQ, PROPHET_WARM_START
+from src.data.cache import load_preprocessed_data
+from src.models.prophet_model import MODEL_DIR, tune_prophet, train_prophet
 from src.models.ensemble import fit_and_forecast
 
 def main():
     # 1) Carga y preprocesado
-    df_raw = load_and_prepare_data()
-    df_ts  = preprocess_sales_data(df_raw, freq=FREQ)
+    df_ts  = load_preprocessed_data(freq=FREQ)
 
-    # 2) Hiperajuste de Prophet
-    best = tune_prophet(df_ts)
-    print(f"🏅 Mejor Prophet → CPS={best['cps']}, SPS={best['sps']}")
+    # 2) Hiperajuste de Prophet (con warm-start se reutilizan los del modelo previo)
+    warm = PROPHET_WARM_START and (MODEL_DIR / "prophet_model.joblib").exists()
+    if warm:
+        best = {"cps": None, "sps": None}
+        print("♻️  Warm-start desde models/prophet_model.joblib")
+    else:
+        best = tune_prophet(df_ts)
+        print(f"🏅 Mejor Prophet → CPS={best['cps']}, SPS={best['sps']}")
 
     # 3) Entrenar Prophet con esos hiperparámetros
     train_prophet(
         df_ts,
         changepoint_prior_scale=best["cps"],
-        seasonality_prior_scale=best["sps"]
+        seasonality_prior_scale=best["sps"],
+        warm_start=warm,
     )
 
     # 4) Forecast ensemble (Prophet + XGBoost residual)
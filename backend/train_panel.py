@@ -0,0 +1,23 @@
+# train_panel.py
+
+#!/usr/bin/env python3
+
+from pathlib import Path
+from src.config import FREQ, PANEL_KEYS, PANEL_MODEL_DIR
+from src.models.panel import load_panel_data, fit_panel
+
+def main():
+    # 1) Carga y preprocesado por serie (PANEL_KEYS)
+    panel = load_panel_data(keys=PANEL_KEYS, freq=FREQ)
+    print(f"📦 {len(panel)} series por {PANEL_KEYS}")
+
+    # 2) Prophet + ensemble por serie, en paralelo
+    forecast = fit_panel(panel, keys=PANEL_KEYS)
+
+    # 3) Guardar forecast combinado
+    out = Path(PANEL_MODEL_DIR) / "forecast_panel.csv"
+    forecast.to_csv(out, index=False)
+    print(f"✅ Forecast panel guardado en {out}")
+
+if __name__ == "__main__":
+    main()